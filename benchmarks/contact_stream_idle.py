@@ -0,0 +1,155 @@
+"""Concurrent idle change-stream connections per worker.
+
+broker mode needs no server: it opens N subscriptions on an in-memory broker,
+each served by a task running the same loop as GET /contacts/stream, and
+reports memory per idle stream and fan-out latency.
+
+http mode opens N real connections to a running single-worker server and
+keeps them idle for --duration seconds, counting heartbeats:
+
+    python -m benchmarks.contact_stream_idle broker --connections 10000
+    python -m benchmarks.contact_stream_idle http --token <jwt> --connections 2000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+from urllib.parse import urlsplit
+
+
+async def run_broker(args):
+    import src.api.contacts as contacts_api
+    from src.events import ContactEvent, ContactEventBroker, InMemoryBackend
+
+    broker = ContactEventBroker(InMemoryBackend(), max_queue=100)
+    contacts_api.contact_events = broker
+    await broker.start()
+
+    received = 0
+
+    async def consume(user_id):
+        nonlocal received
+        async for chunk in contacts_api._contact_event_stream(user_id):
+            if chunk.startswith("id:"):
+                received += 1
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tasks = [
+        asyncio.create_task(consume(i % args.users)) for i in range(args.connections)
+    ]
+    await asyncio.sleep(0.5)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for user_id in range(args.users):
+        await broker.publish(ContactEvent(user_id, "updated", 1, 1))
+    while received < args.connections:
+        await asyncio.sleep(0.001)
+    fanout_ms = (time.perf_counter() - started) * 1000
+
+    await broker.stop()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    print(f"idle streams:          {args.connections}")
+    print(
+        f"memory per stream:     {(after - before) / args.connections / 1024:.1f} KiB"
+    )
+    print(f"fan-out to all streams: {fanout_ms:.1f} ms")
+
+
+async def open_stream(url, token, stats, stop):
+    parts = urlsplit(url)
+    try:
+        reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    except OSError:
+        stats["failed"] += 1
+        return
+    writer.write(
+        (
+            f"GET {parts.path or '/'} HTTP/1.1\r\n"
+            f"Host: {parts.netloc}\r\n"
+            f"Authorization: Bearer {token}\r\n"
+            "Accept: text/event-stream\r\n\r\n"
+        ).encode()
+    )
+    await writer.drain()
+    status_line = await reader.readline()
+    if b" 200 " not in status_line:
+        stats["failed"] += 1
+        writer.close()
+        return
+    stats["open"] += 1
+    try:
+        while not stop.is_set():
+            line = await reader.readline()
+            if not line:
+                break
+            if line.startswith(b": heartbeat"):
+                stats["heartbeats"] += 1
+    finally:
+        stats["open"] -= 1
+        writer.close()
+
+
+async def run_http(args):
+    stats = {"open": 0, "failed": 0, "heartbeats": 0}
+    stop = asyncio.Event()
+    url = args.url.rstrip("/") + "/contacts/stream"
+    tasks = []
+    for _ in range(args.connections):
+        tasks.append(asyncio.create_task(open_stream(url, args.token, stats, stop)))
+        await asyncio.sleep(0)
+
+    await asyncio.sleep(args.duration)
+    peak_open = stats["open"]
+
+    health_url = urlsplit(args.url.rstrip("/") + "/healthcheck/worker")
+    reader, writer = await asyncio.open_connection(
+        health_url.hostname, health_url.port or 80
+    )
+    writer.write(
+        f"GET {health_url.path} HTTP/1.1\r\nHost: {health_url.netloc}\r\n"
+        "Connection: close\r\n\r\n".encode()
+    )
+    body = (await reader.read()).split(b"\r\n\r\n", 1)[-1]
+    writer.close()
+
+    stop.set()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    print(f"streams open after {args.duration:.0f}s: {peak_open}")
+    print(f"failed to open:        {stats['failed']}")
+    print(f"heartbeats received:   {stats['heartbeats']}")
+    try:
+        health = json.loads(body)
+        print(f"worker rss:            {health['rss_mb']} MB")
+    except (ValueError, KeyError):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="mode", required=True)
+
+    broker = sub.add_parser("broker")
+    broker.add_argument("--connections", type=int, default=10000)
+    broker.add_argument("--users", type=int, default=1000)
+
+    http = sub.add_parser("http")
+    http.add_argument("--url", default="http://127.0.0.1:8000")
+    http.add_argument("--token", required=True)
+    http.add_argument("--connections", type=int, default=1000)
+    http.add_argument("--duration", type=float, default=30.0)
+
+    args = parser.parse_args()
+    asyncio.run(run_broker(args) if args.mode == "broker" else run_http(args))
+
+
+if __name__ == "__main__":
+    main()
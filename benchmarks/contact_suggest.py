@@ -0,0 +1,96 @@
+"""Typeahead latency of ContactRepository.suggest_contacts for one large user.
+
+Creates the application schema in a throwaway Postgres schema, gives a single
+user --contacts synthetic contacts and times the repository call for prefixes
+of one to four characters, the way a client would issue them while typing:
+
+    python -m benchmarks.contact_suggest --contacts 100000
+
+Reads DATABASE_URL from the environment/.env and drops its schema on exit
+unless --keep is given.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import string
+import time
+
+SCHEMA = "bench_suggest"
+
+SEED = """
+INSERT INTO contacts (first_name, last_name, email, phone_number, user_id)
+SELECT initcap(substr(md5(g::text), 1, 3 + g % 6)),
+       initcap(substr(md5((g * 7)::text), 1, 4 + g % 7)),
+       substr(md5((g * 13)::text), 1, 8) || g || '@example.com',
+       '+380' || lpad(g::text, 9, '0'),
+       1
+FROM generate_series(1, :contacts) AS g
+"""
+
+
+async def run(args):
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    from src.conf.config import config as app_config
+    from src.database.models import Base, User
+    from src.repository.contacts import ContactRepository
+
+    admin = create_async_engine(app_config.DATABASE_URL)
+    async with admin.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+
+    engine = create_async_engine(
+        app_config.DATABASE_URL,
+        connect_args={"server_settings": {"search_path": SCHEMA}},
+    )
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(text("INSERT INTO users (id, username) VALUES (1, 'b')"))
+            started = time.perf_counter()
+            await conn.execute(text(SEED), {"contacts": args.contacts})
+            await conn.execute(text("ANALYZE contacts"))
+            print(
+                f"seeded {args.contacts} contacts in "
+                f"{time.perf_counter() - started:.1f} s"
+            )
+
+        alphabet = string.ascii_lowercase[:6] + string.digits
+        async with AsyncSession(engine) as session:
+            repo = ContactRepository(session)
+            user = User(id=1)
+            for length in range(1, 5):
+                samples = []
+                for _ in range(args.samples):
+                    prefix = "".join(random.choices(alphabet, k=length))
+                    started = time.perf_counter()
+                    await repo.suggest_contacts(prefix, args.limit, user)
+                    samples.append((time.perf_counter() - started) * 1000)
+                samples.sort()
+                print(
+                    f"prefix length {length}: p50 {statistics.median(samples):.2f} ms"
+                    f"   p95 {samples[int(len(samples) * 0.95) - 1]:.2f} ms"
+                )
+    finally:
+        await engine.dispose()
+        if not args.keep:
+            async with admin.begin() as conn:
+                await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await admin.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--contacts", type=int, default=100000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--keep", action="store_true", help="keep the scratch schema")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
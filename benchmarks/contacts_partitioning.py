@@ -0,0 +1,219 @@
+"""Per-user query latency and maintenance cost: plain vs hash-partitioned contacts.
+
+Builds two scratch tables in a throwaway schema with the production column
+layout and indexes, one plain and one PARTITION BY HASH (user_id). Both get the
+same synthetic data. The script then measures the repository's hot per-user
+queries (page + count, by id, birthday-digest style range) and the cost of
+VACUUM ANALYZE and REINDEX:
+
+    python -m benchmarks.contacts_partitioning --users 20000 --contacts-per-user 500
+
+Reads DATABASE_URL from the environment/.env and drops its schema on exit
+unless --keep is given.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+SCHEMA = "bench_partitioning"
+
+TABLE_DDL = """
+CREATE TABLE {schema}.{table} (
+    id bigint NOT NULL,
+    first_name varchar(50) NOT NULL,
+    last_name varchar(50) NOT NULL,
+    email varchar(100) NOT NULL,
+    phone_number varchar(20) NOT NULL,
+    birthday date,
+    additional_info varchar(255),
+    user_id integer NOT NULL,
+    updated_at timestamp NOT NULL DEFAULT now(),
+    sync_version bigint NOT NULL
+) {partition_clause}
+"""
+
+INDEXES = [
+    "ALTER TABLE {schema}.{table} ADD PRIMARY KEY (id, user_id)",
+    "CREATE INDEX ON {schema}.{table} (email)",
+    "CREATE INDEX ON {schema}.{table} (user_id, updated_at)",
+    "CREATE INDEX ON {schema}.{table} (user_id, sync_version)",
+]
+
+QUERIES = {
+    "page": "SELECT * FROM {schema}.{table} WHERE user_id = $1 OFFSET 0 LIMIT 100",
+    "count": "SELECT count(*) FROM {schema}.{table} WHERE user_id = $1",
+    "by_id": "SELECT * FROM {schema}.{table} WHERE id = $2 AND user_id = $1",
+    "changes": (
+        "SELECT * FROM {schema}.{table} WHERE user_id = $1 AND sync_version > $2 "
+        "ORDER BY sync_version LIMIT 500"
+    ),
+}
+
+
+def dsn_from_config() -> str:
+    from sqlalchemy.engine import make_url
+
+    from src.conf.config import config as app_config
+
+    return (
+        make_url(app_config.DATABASE_URL)
+        .set(drivername="postgresql")
+        .render_as_string(hide_password=False)
+    )
+
+
+async def timed(coro) -> float:
+    started = time.perf_counter()
+    await coro
+    return (time.perf_counter() - started) * 1000
+
+
+async def create_tables(conn, args):
+    await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    await conn.execute(f"CREATE SCHEMA {SCHEMA}")
+    await conn.execute(
+        TABLE_DDL.format(schema=SCHEMA, table="plain", partition_clause="")
+    )
+    await conn.execute(
+        TABLE_DDL.format(
+            schema=SCHEMA,
+            table="hashed",
+            partition_clause="PARTITION BY HASH (user_id)",
+        )
+    )
+    for remainder in range(args.partitions):
+        await conn.execute(
+            f"CREATE TABLE {SCHEMA}.hashed_p{remainder} PARTITION OF {SCHEMA}.hashed "
+            f"FOR VALUES WITH (MODULUS {args.partitions}, REMAINDER {remainder})"
+        )
+
+    seed = f"""
+        SELECT g AS id,
+               'First' || (g % 997), 'Last' || (g % 991),
+               'user' || g || '@example.com', '+380' || lpad((g % 1000000000)::text, 9, '0'),
+               date '1970-01-01' + (g % 18000),
+               NULL,
+               (g % {args.users}) + 1,
+               now(),
+               g
+        FROM generate_series(1, {args.users * args.contacts_per_user}) AS g
+    """
+    for table in ("plain", "hashed"):
+        load_ms = await timed(conn.execute(f"INSERT INTO {SCHEMA}.{table} {seed}"))
+        index_ms = 0.0
+        for ddl in INDEXES:
+            index_ms += await timed(
+                conn.execute(ddl.format(schema=SCHEMA, table=table))
+            )
+        await conn.execute(f"ANALYZE {SCHEMA}.{table}")
+        print(
+            f"{table:<7} load {load_ms:>10.0f} ms   build indexes {index_ms:>10.0f} ms"
+        )
+
+
+async def measure_queries(conn, args) -> dict:
+    results = {}
+    total_rows = args.users * args.contacts_per_user
+    for table in ("plain", "hashed"):
+        for name, sql in QUERIES.items():
+            statement = await conn.prepare(sql.format(schema=SCHEMA, table=table))
+            samples = []
+            for _ in range(args.samples):
+                user_id = random.randint(1, args.users)
+                second = (
+                    random.randint(1, total_rows)
+                    if name == "by_id"
+                    else total_rows // 2
+                )
+                params = (user_id, second) if "$2" in sql else (user_id,)
+                samples.append(await timed(statement.fetch(*params)))
+            samples.sort()
+            results[(table, name)] = (
+                statistics.median(samples),
+                samples[int(len(samples) * 0.95) - 1],
+            )
+    return results
+
+
+async def measure_maintenance(conn) -> dict:
+    results = {}
+    for table in ("plain", "hashed"):
+        # pg_partition_tree() has no rows for a plain table.
+        size = await conn.fetchval(
+            f"SELECT pg_size_pretty(coalesce(sum(pg_total_relation_size(relid)), "
+            f"pg_total_relation_size('{SCHEMA}.{table}'))) "
+            f"FROM pg_partition_tree('{SCHEMA}.{table}')"
+        )
+        # Dirty 1% of the rows so VACUUM has work to do.
+        await conn.execute(
+            f"UPDATE {SCHEMA}.{table} SET updated_at = now() WHERE id % 100 = 0"
+        )
+        vacuum_ms = await timed(conn.execute(f"VACUUM ANALYZE {SCHEMA}.{table}"))
+        reindex_ms = await timed(conn.execute(f"REINDEX TABLE {SCHEMA}.{table}"))
+        if table == "hashed":
+            # Partitions are maintained one at a time in practice; report the
+            # cost of the largest single unit of work as well.
+            partition = await conn.fetchval(
+                f"SELECT relid::regclass::text FROM pg_partition_tree('{SCHEMA}.hashed') "
+                "WHERE isleaf LIMIT 1"
+            )
+            single = await timed(conn.execute(f"VACUUM ANALYZE {partition}"))
+            results[(table, "vacuum_one_partition")] = single
+        results[(table, "size")] = size
+        results[(table, "vacuum")] = vacuum_ms
+        results[(table, "reindex")] = reindex_ms
+    return results
+
+
+async def run(args):
+    import asyncpg
+
+    conn = await asyncpg.connect(args.dsn or dsn_from_config())
+    try:
+        await create_tables(conn, args)
+        queries = await measure_queries(conn, args)
+        maintenance = await measure_maintenance(conn)
+    finally:
+        if not args.keep:
+            await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.close()
+
+    print()
+    print(
+        f"{'query':<10} {'plain p50':>10} {'p95':>8} {'hashed p50':>11} {'p95':>8}  (ms)"
+    )
+    for name in QUERIES:
+        plain, hashed = queries[("plain", name)], queries[("hashed", name)]
+        print(
+            f"{name:<10} {plain[0]:>10.3f} {plain[1]:>8.3f} "
+            f"{hashed[0]:>11.3f} {hashed[1]:>8.3f}"
+        )
+    print()
+    for table in ("plain", "hashed"):
+        print(
+            f"{table:<7} size {maintenance[(table, 'size')]:>10}   "
+            f"VACUUM ANALYZE {maintenance[(table, 'vacuum')]:>8.0f} ms   "
+            f"REINDEX {maintenance[(table, 'reindex')]:>8.0f} ms"
+        )
+    print(
+        "hashed  VACUUM ANALYZE of one partition "
+        f"{maintenance[('hashed', 'vacuum_one_partition')]:.0f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dsn", help="postgresql:// DSN (defaults to DATABASE_URL)")
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--contacts-per-user", type=int, default=50)
+    parser.add_argument("--partitions", type=int, default=32)
+    parser.add_argument("--samples", type=int, default=500)
+    parser.add_argument("--keep", action="store_true", help="keep the scratch schema")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
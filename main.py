@@ -15,9 +15,20 @@ from src.exceptions import (
 from pydantic import ValidationError
 from sqlalchemy.exc import IntegrityError
 from src.conf.config import config as app_config
+from src.events import contact_events
+from src.lifespan import lifespan
+from src.middleware import (
+    AdaptiveConcurrencyMiddleware,
+    InFlightMiddleware,
+    RequestContextMiddleware,
+    concurrency_stats,
+)
+from src.conf.logging_config import logging_state
+from src.services.cache import contact_cache
+from src.tracing import tracer
+from src.worker import worker_state
 
-
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 limiter = Limiter(key_func=get_remote_address)
 
@@ -30,13 +41,17 @@ async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
     )
 
 
+if app_config.CONCURRENCY_LIMIT_ENABLED:
+    app.add_middleware(AdaptiveConcurrencyMiddleware)
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=app_config.CORS_ORIGINS,
+    allow_origins=app_config.cors_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(InFlightMiddleware)
+app.add_middleware(RequestContextMiddleware)
 
 app.include_router(contacts.router)
 app.include_router(users.router)
@@ -53,7 +68,26 @@ async def healthchecker():
     return {"message": "The application is up and running!"}
 
 
+@app.get("/healthcheck/worker")
+async def worker_healthchecker():
+    return {
+        **worker_state.health(),
+        "contact_events": contact_events.stats(),
+        "contact_cache": contact_cache.stats(),
+        "contact_reads": contact_cache.loads.stats(),
+        "concurrency": concurrency_stats(),
+        "logging": logging_state.stats(),
+        "tracing": tracer.stats(),
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run("main:app", host="127.0.0.1", port=8000, reload=True)
+    uvicorn.run(
+        "main:app",
+        host="127.0.0.1",
+        port=8000,
+        reload=True,
+        timeout_graceful_shutdown=int(app_config.SHUTDOWN_DRAIN_TIMEOUT),
+    )
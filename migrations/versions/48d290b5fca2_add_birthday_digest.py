@@ -0,0 +1,47 @@
+"""add birthday digest
+
+Revision ID: 48d290b5fca2
+Revises: 6ac67e7fd7e7
+Create Date: 2026-10-19 09:40:02.117354
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "48d290b5fca2"
+down_revision: Union[str, None] = "6ac67e7fd7e7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "birthday_digest",
+        sa.Column("contact_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("next_birthday", sa.Date(), nullable=False),
+        sa.ForeignKeyConstraint(["contact_id"], ["contacts.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("contact_id"),
+    )
+    op.create_index(
+        "ix_birthday_digest_user_id_next_birthday",
+        "birthday_digest",
+        ["user_id", "next_birthday"],
+        unique=False,
+    )
+    # Existing contacts are filled in by the birthday digest job, which runs
+    # on application startup.
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_birthday_digest_user_id_next_birthday", table_name="birthday_digest"
+    )
+    op.drop_table("birthday_digest")
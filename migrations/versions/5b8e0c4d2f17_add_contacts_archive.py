@@ -0,0 +1,56 @@
+"""add contacts archive
+
+Revision ID: 5b8e0c4d2f17
+Revises: 9e4b7d2a61c5
+Create Date: 2026-10-19 14:32:50.118264
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "5b8e0c4d2f17"
+down_revision: Union[str, None] = "9e4b7d2a61c5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "contacts_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("first_name", sa.String(length=50), nullable=False),
+        sa.Column("last_name", sa.String(length=50), nullable=False),
+        sa.Column("email", sa.String(length=100), nullable=False),
+        sa.Column("phone_number", sa.String(length=20), nullable=False),
+        sa.Column("birthday", sa.Date(), nullable=True),
+        sa.Column("additional_info", sa.String(length=255), nullable=True),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column(
+            "deleted_at", sa.DateTime(), server_default=sa.func.now(), nullable=False
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_contacts_archive_user_id_deleted_at",
+        "contacts_archive",
+        ["user_id", "deleted_at"],
+    )
+    op.create_index(
+        "ix_contacts_archive_deleted_at", "contacts_archive", ["deleted_at"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_contacts_archive_deleted_at", table_name="contacts_archive")
+    op.drop_index(
+        "ix_contacts_archive_user_id_deleted_at", table_name="contacts_archive"
+    )
+    op.drop_table("contacts_archive")
@@ -0,0 +1,108 @@
+"""add normalized contact phone numbers
+
+Adds contacts.phone_e164 with a (user_id, phone_e164) index and backfills it
+in batches from phone_number:
+
+    alembic [-x batch_size=5000] [-x phone_country_code=380] upgrade head
+
+The country code for national numbers falls back to the PHONE_DEFAULT_COUNTRY_CODE
+environment variable, then to 380.
+
+Revision ID: 7f3a2d9c8b41
+Revises: e2c94f1b7a30
+Create Date: 2026-10-19 16:57:41.260833
+
+"""
+
+import os
+import re
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "7f3a2d9c8b41"
+down_revision: Union[str, None] = "e2c94f1b7a30"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# A frozen copy of src.services.phones.normalize_phone as of this revision, so
+# the backfill does not change when the live normalizer does.
+_E164_MAX_DIGITS = 15
+_E164_MIN_DIGITS = 8
+_NATIONAL_MAX_DIGITS = 10
+_EXTENSION = re.compile(r"(?:ext\.?|x|#).*$", re.IGNORECASE)
+_NON_DIGITS = re.compile(r"\D")
+
+
+def _normalize_phone(raw, default_country_code: str):
+    if not raw:
+        return None
+    number = _EXTENSION.sub("", raw).strip()
+    digits = _NON_DIGITS.sub("", number)
+    if number.startswith("+"):
+        pass
+    elif digits.startswith("00"):
+        digits = digits[2:]
+    elif digits.startswith("0"):
+        digits = default_country_code + digits[1:]
+    elif not (
+        digits.startswith(default_country_code) and len(digits) > _NATIONAL_MAX_DIGITS
+    ):
+        digits = default_country_code + digits
+    if not _E164_MIN_DIGITS <= len(digits) <= _E164_MAX_DIGITS or digits[0] == "0":
+        return None
+    return f"+{digits}"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "contacts", sa.Column("phone_e164", sa.String(length=16), nullable=True)
+    )
+    op.create_index(
+        "ix_contacts_user_id_phone_e164", "contacts", ["user_id", "phone_e164"]
+    )
+    if context.is_offline_mode():
+        return
+
+    # The normalizer is Python, so rows are read and written back in id order
+    # outside the migration transaction, in batches. Backfilled rows keep their
+    # sync_version: the visible data does not change.
+    x_arguments = context.get_x_argument(as_dictionary=True)
+    batch_size = int(x_arguments.get("batch_size", 5000))
+    country_code = x_arguments.get(
+        "phone_country_code", os.environ.get("PHONE_DEFAULT_COUNTRY_CODE", "380")
+    )
+    connection = op.get_bind()
+    select_batch = sa.text(
+        "SELECT id, user_id, phone_number FROM contacts "
+        "WHERE id > :after ORDER BY id LIMIT :limit"
+    )
+    update_row = sa.text(
+        "UPDATE contacts SET phone_e164 = :phone_e164 "
+        "WHERE id = :id AND user_id = :user_id"
+    )
+    with op.get_context().autocommit_block():
+        after = 0
+        while True:
+            rows = connection.execute(
+                select_batch, {"after": after, "limit": batch_size}
+            ).all()
+            if not rows:
+                break
+            updates = [
+                {"id": id_, "user_id": user_id, "phone_e164": phone_e164}
+                for id_, user_id, phone_number in rows
+                if (phone_e164 := _normalize_phone(phone_number, country_code))
+            ]
+            if updates:
+                connection.execute(update_row, updates)
+            after = rows[-1][0]
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_contacts_user_id_phone_e164", table_name="contacts")
+    op.drop_column("contacts", "phone_e164")
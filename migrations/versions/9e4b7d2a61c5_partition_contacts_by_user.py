@@ -0,0 +1,234 @@
+"""optionally hash-partition contacts by user_id
+
+Opt-in: without ``-x contacts_partitions=N`` this revision changes nothing.
+
+    alembic -x contacts_partitions=32 [-x batch_size=10000] upgrade head
+
+The move is online. A trigger mirrors writes on ``contacts`` into the new
+partitioned table while existing rows are copied in autocommitted batches.
+The tables are swapped under a short ACCESS EXCLUSIVE lock at the end.
+
+Primary and unique keys of a partitioned table must include the partition key,
+so the primary key becomes (id, user_id) and email uniqueness is enforced per
+user by the database (create_contact still checks it globally).
+
+Revision ID: 9e4b7d2a61c5
+Revises: c3f1a9e27b64
+Create Date: 2026-10-19 13:05:18.774502
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "9e4b7d2a61c5"
+down_revision: Union[str, None] = "c3f1a9e27b64"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _x_argument(name: str, default=None):
+    return context.get_x_argument(as_dictionary=True).get(name, default)
+
+
+def _is_partitioned(connection) -> bool:
+    return bool(
+        connection.execute(
+            sa.text(
+                "SELECT 1 FROM pg_partitioned_table "
+                "WHERE partrelid = 'contacts'::regclass"
+            )
+        ).scalar()
+    )
+
+
+def _columns(connection) -> list[str]:
+    return list(
+        connection.execute(
+            sa.text(
+                "SELECT column_name FROM information_schema.columns "
+                "WHERE table_schema = current_schema() AND table_name = 'contacts' "
+                "ORDER BY ordinal_position"
+            )
+        ).scalars()
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    partitions = int(_x_argument("contacts_partitions", 0))
+    if partitions < 2 or context.is_offline_mode():
+        return
+    batch_size = int(_x_argument("batch_size", 10000))
+
+    connection = op.get_bind()
+    if _is_partitioned(connection):
+        return
+    if connection.execute(
+        sa.text("SELECT 1 FROM contacts WHERE user_id IS NULL LIMIT 1")
+    ).scalar():
+        raise RuntimeError(
+            "contacts rows without user_id cannot be placed in a partition"
+        )
+
+    columns = _columns(connection)
+    column_list = ", ".join(columns)
+    new_values = ", ".join(f"NEW.{column}" for column in columns)
+    update_set = ", ".join(f"{column} = EXCLUDED.{column}" for column in columns)
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE TABLE contacts_partitioned "
+            "(LIKE contacts INCLUDING DEFAULTS) PARTITION BY HASH (user_id)"
+        )
+        op.execute("ALTER TABLE contacts_partitioned ALTER COLUMN user_id SET NOT NULL")
+        for remainder in range(partitions):
+            op.execute(
+                f"CREATE TABLE contacts_p{remainder} PARTITION OF contacts_partitioned "
+                f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+            )
+        op.execute(
+            "ALTER TABLE contacts_partitioned "
+            "ADD CONSTRAINT contacts_partitioned_pkey PRIMARY KEY (id, user_id)"
+        )
+        op.execute(
+            "ALTER TABLE contacts_partitioned ADD CONSTRAINT "
+            "contacts_partitioned_user_id_email_key UNIQUE (user_id, email)"
+        )
+        op.execute(
+            "CREATE INDEX ix_contacts_partitioned_id ON contacts_partitioned (id)"
+        )
+        op.execute(
+            "CREATE INDEX ix_contacts_partitioned_email ON contacts_partitioned (email)"
+        )
+        op.execute(
+            "CREATE INDEX ix_contacts_partitioned_user_id_updated_at "
+            "ON contacts_partitioned (user_id, updated_at)"
+        )
+        op.execute(
+            "CREATE INDEX ix_contacts_partitioned_user_id_sync_version "
+            "ON contacts_partitioned (user_id, sync_version)"
+        )
+
+        # Mirror every write from here on. The trigger's upsert wins over a
+        # stale row inserted by a concurrent copy batch; copy batches never
+        # overwrite what the trigger wrote.
+        op.execute(f"""
+            CREATE FUNCTION contacts_mirror_to_partitioned() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                    DELETE FROM contacts_partitioned
+                    WHERE id = OLD.id AND user_id = OLD.user_id;
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    INSERT INTO contacts_partitioned ({column_list})
+                    VALUES ({new_values})
+                    ON CONFLICT (id, user_id) DO UPDATE SET {update_set};
+                END IF;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+            """)
+        op.execute(
+            "CREATE TRIGGER contacts_mirror_to_partitioned "
+            "AFTER INSERT OR UPDATE OR DELETE ON contacts "
+            "FOR EACH ROW EXECUTE FUNCTION contacts_mirror_to_partitioned()"
+        )
+
+        # FOR KEY SHARE: without it a DELETE that commits while a batch still
+        # sees the row would find nothing to mirror, and the batch would then
+        # copy the deleted row. Locked, the DELETE either commits first (the
+        # batch skips the row) or waits for the batch and its trigger removes
+        # the copy. Non-key UPDATEs are not blocked; the upsert above covers
+        # them.
+        max_id = connection.execute(sa.text("SELECT max(id) FROM contacts")).scalar()
+        copy_batch = sa.text(
+            f"INSERT INTO contacts_partitioned ({column_list}) "
+            f"SELECT {column_list} FROM contacts "
+            "WHERE id > :low AND id <= :high FOR KEY SHARE "
+            "ON CONFLICT (id, user_id) DO NOTHING"
+        )
+        low = 0
+        while max_id is not None and low < max_id:
+            connection.execute(copy_batch, {"low": low, "high": low + batch_size})
+            low += batch_size
+
+    # Swap: one short transaction.
+    op.execute("LOCK TABLE contacts IN ACCESS EXCLUSIVE MODE")
+    op.execute("DROP TRIGGER contacts_mirror_to_partitioned ON contacts")
+    op.execute("DROP FUNCTION contacts_mirror_to_partitioned()")
+    op.execute(
+        "ALTER TABLE birthday_digest "
+        "DROP CONSTRAINT IF EXISTS birthday_digest_contact_id_fkey"
+    )
+    op.execute("ALTER TABLE contacts RENAME TO contacts_unpartitioned")
+    op.execute("ALTER TABLE contacts_partitioned RENAME TO contacts")
+    op.execute("ALTER SEQUENCE contacts_id_seq OWNED BY contacts.id")
+    op.execute("DROP TABLE contacts_unpartitioned")
+
+    op.execute(
+        "ALTER TABLE contacts RENAME CONSTRAINT contacts_partitioned_pkey "
+        "TO contacts_pkey"
+    )
+    op.execute(
+        "ALTER TABLE contacts RENAME CONSTRAINT "
+        "contacts_partitioned_user_id_email_key TO contacts_user_id_email_key"
+    )
+    for name in ("id", "email", "user_id_updated_at", "user_id_sync_version"):
+        op.execute(
+            f"ALTER INDEX ix_contacts_partitioned_{name} RENAME TO ix_contacts_{name}"
+        )
+    op.execute(
+        "ALTER TABLE contacts ADD CONSTRAINT contacts_user_id_fkey "
+        "FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE"
+    )
+    op.execute(
+        "ALTER TABLE birthday_digest ADD CONSTRAINT birthday_digest_contact_id_fkey "
+        "FOREIGN KEY (contact_id, user_id) REFERENCES contacts (id, user_id) "
+        "ON DELETE CASCADE"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if context.is_offline_mode():
+        return
+    connection = op.get_bind()
+    if not _is_partitioned(connection):
+        return
+
+    column_list = ", ".join(_columns(connection))
+    op.execute("LOCK TABLE contacts IN ACCESS EXCLUSIVE MODE")
+    op.execute(
+        "ALTER TABLE birthday_digest DROP CONSTRAINT birthday_digest_contact_id_fkey"
+    )
+    op.execute("CREATE TABLE contacts_unpartitioned (LIKE contacts INCLUDING DEFAULTS)")
+    op.execute(
+        f"INSERT INTO contacts_unpartitioned ({column_list}) "
+        f"SELECT {column_list} FROM contacts"
+    )
+    op.execute("ALTER SEQUENCE contacts_id_seq OWNED BY contacts_unpartitioned.id")
+    op.execute("DROP TABLE contacts")
+    op.execute("ALTER TABLE contacts_unpartitioned RENAME TO contacts")
+    op.execute("ALTER TABLE contacts ALTER COLUMN user_id DROP NOT NULL")
+
+    op.execute("ALTER TABLE contacts ADD CONSTRAINT contacts_pkey PRIMARY KEY (id)")
+    op.create_index("ix_contacts_id", "contacts", ["id"])
+    op.create_index("ix_contacts_email", "contacts", ["email"], unique=True)
+    op.create_index(
+        "ix_contacts_user_id_updated_at", "contacts", ["user_id", "updated_at"]
+    )
+    op.create_index(
+        "ix_contacts_user_id_sync_version", "contacts", ["user_id", "sync_version"]
+    )
+    op.execute(
+        "ALTER TABLE contacts ADD CONSTRAINT contacts_user_id_fkey "
+        "FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE"
+    )
+    op.execute(
+        "ALTER TABLE birthday_digest ADD CONSTRAINT birthday_digest_contact_id_fkey "
+        "FOREIGN KEY (contact_id) REFERENCES contacts (id) ON DELETE CASCADE"
+    )
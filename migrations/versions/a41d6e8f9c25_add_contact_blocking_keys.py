@@ -0,0 +1,122 @@
+"""add duplicate-detection blocking keys to contacts
+
+Adds contacts.email_key and contacts.name_key with (user_id, key) indexes and
+backfills them in batches (phone_e164 serves as the phone key):
+
+    alembic [-x batch_size=5000] upgrade head
+
+Revision ID: a41d6e8f9c25
+Revises: 7f3a2d9c8b41
+Create Date: 2026-10-19 18:14:22.907415
+
+"""
+
+from typing import Optional, Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "a41d6e8f9c25"
+down_revision: Union[str, None] = "7f3a2d9c8b41"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# A frozen copy of the blocking keys in src.services.dedupe as of this
+# revision, so the backfill does not change when the live keys do.
+_SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+
+def _soundex(word: str) -> str:
+    letters = [c for c in word.lower() if "a" <= c <= "z"]
+    if not letters:
+        return ""
+
+    code = letters[0].upper()
+    previous = _SOUNDEX_CODES.get(letters[0], "")
+    for letter in letters[1:]:
+        digit = _SOUNDEX_CODES.get(letter, "")
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        if letter not in "hw":
+            previous = digit
+    return code.ljust(4, "0")
+
+
+def _phonetic(word: str) -> str:
+    return _soundex(word) or "".join(c for c in word.casefold() if c.isalpha())
+
+
+def _name_key(first_name: Optional[str], last_name: Optional[str]) -> Optional[str]:
+    parts = sorted(
+        key for key in (_phonetic(first_name or ""), _phonetic(last_name or "")) if key
+    )
+    return " ".join(parts) or None
+
+
+def _email_key(email: Optional[str]) -> Optional[str]:
+    if not email:
+        return None
+    local = email.rsplit("@", 1)[0].lower().split("+", 1)[0].replace(".", "")
+    return local or None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("contacts", sa.Column("email_key", sa.String(length=100)))
+    op.add_column("contacts", sa.Column("name_key", sa.String(length=120)))
+    op.create_index(
+        "ix_contacts_user_id_email_key", "contacts", ["user_id", "email_key"]
+    )
+    op.create_index("ix_contacts_user_id_name_key", "contacts", ["user_id", "name_key"])
+    if context.is_offline_mode():
+        return
+
+    batch_size = int(context.get_x_argument(as_dictionary=True).get("batch_size", 5000))
+    connection = op.get_bind()
+    select_batch = sa.text(
+        "SELECT id, user_id, email, first_name, last_name FROM contacts "
+        "WHERE id > :after ORDER BY id LIMIT :limit"
+    )
+    update_row = sa.text(
+        "UPDATE contacts SET email_key = :email_key, name_key = :name_key "
+        "WHERE id = :id AND user_id = :user_id"
+    )
+    with op.get_context().autocommit_block():
+        after = 0
+        while True:
+            rows = connection.execute(
+                select_batch, {"after": after, "limit": batch_size}
+            ).all()
+            if not rows:
+                break
+            connection.execute(
+                update_row,
+                [
+                    {
+                        "id": id_,
+                        "user_id": user_id,
+                        "email_key": _email_key(email),
+                        "name_key": _name_key(first_name, last_name),
+                    }
+                    for id_, user_id, email, first_name, last_name in rows
+                ],
+            )
+            after = rows[-1][0]
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_contacts_user_id_name_key", table_name="contacts")
+    op.drop_index("ix_contacts_user_id_email_key", table_name="contacts")
+    op.drop_column("contacts", "name_key")
+    op.drop_column("contacts", "email_key")
@@ -0,0 +1,90 @@
+"""add contact tags
+
+Revision ID: b6f0e3a7d852
+Revises: a41d6e8f9c25
+Create Date: 2026-10-19 19:36:58.641270
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "b6f0e3a7d852"
+down_revision: Union[str, None] = "a41d6e8f9c25"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _contacts_partitioned() -> bool:
+    if context.is_offline_mode():
+        return False
+    return bool(
+        op.get_bind()
+        .execute(
+            sa.text(
+                "SELECT 1 FROM pg_partitioned_table "
+                "WHERE partrelid = 'contacts'::regclass"
+            )
+        )
+        .scalar()
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ("contacts", "contacts_archive"):
+        op.add_column(
+            table,
+            sa.Column(
+                "tags",
+                postgresql.ARRAY(sa.String(length=50)),
+                server_default="{}",
+                nullable=False,
+            ),
+        )
+    # btree_gin gives user_id a GIN operator class, so one index answers
+    # "this user's contacts with these tags" without scanning every user's
+    # matches for the tag. A trusted extension since Postgres 13.
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+    op.create_index(
+        "ix_contacts_user_id_tags",
+        "contacts",
+        ["user_id", "tags"],
+        postgresql_using="gin",
+    )
+
+    # A partitioned contacts table is only unique on (id, user_id) (see
+    # 9e4b7d2a61c5), so the foreign key has to reference both columns.
+    if _contacts_partitioned():
+        contact_fk = sa.ForeignKeyConstraint(
+            ["contact_id", "user_id"],
+            ["contacts.id", "contacts.user_id"],
+            ondelete="CASCADE",
+        )
+    else:
+        contact_fk = sa.ForeignKeyConstraint(
+            ["contact_id"], ["contacts.id"], ondelete="CASCADE"
+        )
+    op.create_table(
+        "contact_tags",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("tag", sa.String(length=50), nullable=False),
+        sa.Column("contact_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        contact_fk,
+        sa.PrimaryKeyConstraint("user_id", "tag", "contact_id"),
+    )
+    op.create_index("ix_contact_tags_contact_id", "contact_tags", ["contact_id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_contact_tags_contact_id", table_name="contact_tags")
+    op.drop_table("contact_tags")
+    op.drop_index("ix_contacts_user_id_tags", table_name="contacts")
+    op.drop_column("contacts_archive", "tags")
+    op.drop_column("contacts", "tags")
@@ -0,0 +1,80 @@
+"""add contact sync columns and tombstones
+
+Revision ID: c3f1a9e27b64
+Revises: 48d290b5fca2
+Create Date: 2026-10-19 10:21:37.402611
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "c3f1a9e27b64"
+down_revision: Union[str, None] = "48d290b5fca2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(sa.schema.CreateSequence(sa.Sequence("contact_sync_seq")))
+    op.add_column(
+        "contacts",
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=False
+        ),
+    )
+    # The volatile default gives every existing row its own sync version.
+    op.add_column(
+        "contacts",
+        sa.Column(
+            "sync_version",
+            sa.BigInteger(),
+            server_default=sa.text("nextval('contact_sync_seq')"),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_contacts_user_id_updated_at", "contacts", ["user_id", "updated_at"]
+    )
+    op.create_index(
+        "ix_contacts_user_id_sync_version", "contacts", ["user_id", "sync_version"]
+    )
+
+    op.create_table(
+        "contact_tombstones",
+        sa.Column("contact_id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "sync_version",
+            sa.BigInteger(),
+            server_default=sa.text("nextval('contact_sync_seq')"),
+            nullable=False,
+        ),
+        sa.Column(
+            "deleted_at", sa.DateTime(), server_default=sa.func.now(), nullable=False
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("contact_id"),
+    )
+    op.create_index(
+        "ix_contact_tombstones_user_id_sync_version",
+        "contact_tombstones",
+        ["user_id", "sync_version"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_contact_tombstones_user_id_sync_version", table_name="contact_tombstones"
+    )
+    op.drop_table("contact_tombstones")
+    op.drop_index("ix_contacts_user_id_sync_version", table_name="contacts")
+    op.drop_index("ix_contacts_user_id_updated_at", table_name="contacts")
+    op.drop_column("contacts", "sync_version")
+    op.drop_column("contacts", "updated_at")
+    op.execute(sa.schema.DropSequence(sa.Sequence("contact_sync_seq")))
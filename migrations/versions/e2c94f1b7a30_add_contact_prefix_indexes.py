@@ -0,0 +1,36 @@
+"""add contact name and email prefix indexes
+
+Revision ID: e2c94f1b7a30
+Revises: 5b8e0c4d2f17
+Create Date: 2026-10-19 15:48:06.530917
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "e2c94f1b7a30"
+down_revision: Union[str, None] = "5b8e0c4d2f17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = ("first_name", "last_name", "email")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for column in COLUMNS:
+        op.create_index(
+            f"ix_contacts_user_id_lower_{column}",
+            "contacts",
+            ["user_id", sa.text(f"lower({column}) text_pattern_ops")],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for column in COLUMNS:
+        op.drop_index(f"ix_contacts_user_id_lower_{column}", table_name="contacts")
@@ -0,0 +1,38 @@
+"""add contact sync horizons for tombstone retention
+
+Revision ID: f7a3c5d91e28
+Revises: b6f0e3a7d852
+Create Date: 2026-10-19 21:05:12.518304
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "f7a3c5d91e28"
+down_revision: Union[str, None] = "b6f0e3a7d852"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_contact_tombstones_deleted_at", "contact_tombstones", ["deleted_at"]
+    )
+    op.create_table(
+        "contact_sync_horizons",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("purged_through", sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("contact_sync_horizons")
+    op.drop_index("ix_contact_tombstones_deleted_at", table_name="contact_tombstones")
@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
+from src.conf.config import config as app_config
 from src.database.db import get_db
 from src.database.models import User
 from src.schemas import (
@@ -9,7 +11,17 @@ from src.schemas import (
     ContactUpdate,
     ContactResponse,
     ContactListResponse,
+    ContactChangesResponse,
+    ContactMultiGetRequest,
+    ContactMultiGetResponse,
+    ArchivedContactListResponse,
+    ContactPhoneLookupRequest,
+    ContactPhoneLookupResponse,
+    ContactDuplicatesResponse,
+    ContactMergeRequest,
+    ContactTagCount,
 )
+from src.events import SubscriptionClosed, contact_events
 from src.services.auth import get_current_user
 from src.services.contacts import ContactService
 
@@ -44,11 +56,196 @@ async def get_contacts(
     first_name: Optional[str] = Query(None, description="Filter by first name"),
     last_name: Optional[str] = Query(None, description="Filter by last name"),
     email: Optional[str] = Query(None, description="Filter by email"),
+    tags: Optional[List[str]] = Query(None, description="Has all of these tags"),
+    any_tags: Optional[List[str]] = Query(None, description="Has any of these tags"),
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
     service = ContactService(db)
-    return await service.get_contacts(skip, limit, first_name, last_name, email, user)
+    return await service.get_contacts(
+        skip, limit, first_name, last_name, email, user, tags, any_tags
+    )
+
+
+@router.post(
+    "/multi-get",
+    response_model=ContactMultiGetResponse,
+    responses={422: {"description": "Validation Error"}},
+)
+async def get_contacts_by_ids(
+    body: ContactMultiGetRequest,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    service = ContactService(db)
+    return await service.get_contacts_by_ids(body.ids, user)
+
+
+@router.get(
+    "/changes",
+    response_model=ContactChangesResponse,
+    responses={410: {"description": "Sync token older than tombstone retention"}},
+)
+async def get_contact_changes(
+    since: int = Query(0, ge=0, description="Sync token returned by the last call"),
+    limit: int = Query(500, ge=1, le=1000, description="Max number of changes"),
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    service = ContactService(db)
+    return await service.get_changes(since, limit, user)
+
+
+@router.get("/suggest", response_model=List[ContactResponse])
+async def suggest_contacts(
+    q: str = Query(
+        ..., min_length=1, max_length=100, description="Name or email prefix"
+    ),
+    limit: int = Query(10, ge=1, le=50, description="Max number of suggestions"),
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    service = ContactService(db)
+    return await service.suggest_contacts(q, limit, user)
+
+
+@router.get(
+    "/lookup",
+    response_model=List[ContactResponse],
+    responses={400: {"description": "Invalid phone number"}},
+)
+async def lookup_phone(
+    phone: str = Query(
+        ..., min_length=1, max_length=32, description="Phone number in any format"
+    ),
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    service = ContactService(db)
+    return await service.lookup_phone(phone, user)
+
+
+@router.post(
+    "/lookup",
+    response_model=ContactPhoneLookupResponse,
+    responses={422: {"description": "Validation Error"}},
+)
+async def lookup_phones(
+    body: ContactPhoneLookupRequest,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    service = ContactService(db)
+    return await service.lookup_phones(body.phones, user)
+
+
+@router.get("/tags", response_model=List[ContactTagCount])
+async def get_tag_counts(
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    service = ContactService(db)
+    return await service.get_tag_counts(user)
+
+
+@router.get("/duplicates", response_model=ContactDuplicatesResponse)
+async def get_duplicate_contacts(
+    skip: int = Query(0, ge=0, description="Number of pairs to skip"),
+    limit: int = Query(50, ge=1, le=200, description="Max number of pairs"),
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    service = ContactService(db)
+    return await service.get_duplicates(skip, limit, user)
+
+
+@router.get("/archive", response_model=ArchivedContactListResponse)
+async def get_archived_contacts(
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(100, le=500, description="Max number of records to return"),
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    service = ContactService(db)
+    return await service.get_archived_contacts(skip, limit, user)
+
+
+@router.post(
+    "/archive/{contact_id}/restore",
+    response_model=ContactResponse,
+    responses={
+        404: {"description": "Not Found"},
+        409: {"description": "Conflict: Contact with this email already exists"},
+    },
+)
+async def restore_contact(
+    contact_id: int,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    service = ContactService(db)
+    contact = await service.restore_contact(contact_id, user)
+    if contact is None:
+        raise HTTPException(status_code=404, detail="Archived contact not found")
+    return contact
+
+
+@router.delete(
+    "/archive/{contact_id}",
+    status_code=204,
+    responses={404: {"description": "Not Found"}},
+)
+async def purge_contact(
+    contact_id: int,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    service = ContactService(db)
+    if await service.purge_contact(contact_id, user) is None:
+        raise HTTPException(status_code=404, detail="Archived contact not found")
+
+
+async def _contact_event_stream(user_id: int):
+    subscription = contact_events.subscribe(user_id)
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                event = await subscription.next_event(
+                    app_config.EVENTS_HEARTBEAT_SECONDS
+                )
+            except SubscriptionClosed:
+                if subscription.missed_events:
+                    yield "event: resync\ndata: {}\n\n"
+                return
+            if event is None:
+                yield ": heartbeat\n\n"
+                continue
+            yield f"id: {event.version}\nevent: contact\ndata: {event.to_json()}\n\n"
+    finally:
+        contact_events.unsubscribe(subscription)
+
+
+@router.get(
+    "/stream",
+    response_class=StreamingResponse,
+    responses={503: {"description": "Too many open streams"}},
+)
+async def stream_contact_changes(
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    if contact_events.subscriber_count >= app_config.EVENTS_MAX_STREAMS:
+        raise HTTPException(status_code=503, detail="Too many open streams")
+
+    # The stream can stay open for hours; give the pooled connection used for
+    # authentication back right away.
+    await db.close()
+    return StreamingResponse(
+        _contact_event_stream(user.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/{contact_id}", response_model=ContactResponse)
@@ -64,6 +261,24 @@ async def get_contact_by_id(
     return contact
 
 
+@router.post(
+    "/{contact_id}/merge",
+    response_model=ContactResponse,
+    responses={404: {"description": "Not Found"}},
+)
+async def merge_contacts(
+    contact_id: int,
+    body: ContactMergeRequest,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    service = ContactService(db)
+    contact = await service.merge_contacts(contact_id, body.duplicate_ids, user)
+    if contact is None:
+        raise HTTPException(status_code=404, detail="Contact not found")
+    return contact
+
+
 @router.get("/birthdays/", response_model=ContactListResponse)
 async def get_upcoming_birthdays(
     days: int = Query(
@@ -71,11 +286,13 @@ async def get_upcoming_birthdays(
     ),
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, le=500, description="Max number of records to return"),
+    tags: Optional[List[str]] = Query(None, description="Has all of these tags"),
+    any_tags: Optional[List[str]] = Query(None, description="Has any of these tags"),
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
     service = ContactService(db)
-    return await service.get_upcoming_birthdays(days, skip, limit, user)
+    return await service.get_upcoming_birthdays(days, skip, limit, user, tags, any_tags)
 
 
 @router.patch(
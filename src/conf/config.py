@@ -1,34 +1,93 @@
-import os
-from dotenv import load_dotenv
-from pydantic import EmailStr, ConfigDict
-from pydantic_settings import BaseSettings
+from typing import Literal
 
-load_dotenv()
+from pydantic import EmailStr, Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Config(BaseSettings):
-    DATABASE_URL: str = os.getenv("DATABASE_URL")
-    JWT_SECRET: str = os.getenv("JWT_SECRET")
-    JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM")
-    JWT_EXPIRATION_TIME: int = os.getenv("JWT_EXPIRATION_TIME")
-    CORS_ORIGINS: str = os.getenv("CORS_ORIGINS").split(",")
-
-    MAIL_USERNAME: EmailStr = os.getenv("MAIL_USERNAME")
-    MAIL_PASSWORD: str = os.getenv("MAIL_PASSWORD")
-    MAIL_FROM: EmailStr = os.getenv("MAIL_FROM")
-    MAIL_PORT: int = os.getenv("MAIL_PORT")
-    MAIL_SERVER: str = os.getenv("MAIL_SERVER")
-    MAIL_FROM_NAME: str = os.getenv("MAIL_FROM_NAME")
+    DATABASE_URL: str
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 1800
+    DB_WARMUP_CONNECTIONS: int = 5
+    SHUTDOWN_DRAIN_TIMEOUT: float = 25.0
+
+    CONCURRENCY_LIMIT_ENABLED: bool = True
+    CONCURRENCY_MIN_LIMIT: int = 2
+    CONCURRENCY_MAX_LIMIT: int = 200
+    CONCURRENCY_MAX_QUEUE: int = 50
+    CONCURRENCY_QUEUE_TIMEOUT: float = 1.0
+    CONCURRENCY_RETRY_AFTER_SECONDS: int = 1
+    CONCURRENCY_TARGET_AUTH_MS: int = 1000
+    CONCURRENCY_TARGET_READ_MS: int = 250
+    CONCURRENCY_TARGET_WRITE_MS: int = 500
+
+    BIRTHDAY_DIGEST_BATCH_SIZE: int = 1000
+    ARCHIVE_RETENTION_DAYS: int = 30
+    ARCHIVE_PURGE_BATCH_SIZE: int = 1000
+    TOMBSTONE_RETENTION_DAYS: int = 90
+    TOMBSTONE_PURGE_BATCH_SIZE: int = 1000
+    PHONE_DEFAULT_COUNTRY_CODE: str = "380"
+
+    # memory, postgres, or unset: postgres when running several workers.
+    EVENTS_BACKEND: str | None = None
+    EVENTS_QUEUE_SIZE: int = 100
+    EVENTS_HEARTBEAT_SECONDS: float = 15.0
+    EVENTS_MAX_STREAMS: int = 1000
+
+    CACHE_ENABLED: bool = True
+    CACHE_TTL_SECONDS: float = 60.0
+    CACHE_LOCAL_MAX_ENTRIES: int = 10000
+    CACHE_REDIS_URL: str | None = None
+
+    JWT_SECRET: str
+    JWT_ALGORITHM: str = "HS256"
+    JWT_EXPIRATION_TIME: int = 3600
+    CORS_ORIGINS: str = ""
+
+    MAIL_USERNAME: EmailStr
+    MAIL_PASSWORD: str
+    MAIL_FROM: EmailStr
+    MAIL_PORT: int = 587
+    MAIL_SERVER: str
+    MAIL_FROM_NAME: str = "FastAPI Contacts"
     MAIL_STARTTLS: bool = True
     MAIL_SSL_TLS: bool = True
     USE_CREDENTIALS: bool = True
     VALIDATE_CERTS: bool = True
 
-    CLOUDINARY_NAME: str = os.getenv("CLOUDINARY_NAME")
-    CLOUDINARY_API_KEY: str = os.getenv("CLOUDINARY_API_KEY")
-    CLOUDINARY_API_SECRET: str = os.getenv("CLOUDINARY_API_SECRET")
+    CLOUDINARY_NAME: str | None = None
+    CLOUDINARY_API_KEY: str | None = None
+    CLOUDINARY_API_SECRET: str | None = None
+
+    STARTUP_IMPORT_BUDGET_RATIO: float = 1.5
+
+    WEB_HOST: str = "0.0.0.0"
+    WEB_PORT: int = 8000
+    WEB_WORKERS: int = 0
+    WEB_PRELOAD: bool = True
+    WORKER_MAX_REQUESTS: int = 10000
+    WORKER_MAX_REQUESTS_JITTER: int = 1000
+    WORKER_MAX_MEMORY_MB: int = 512
+    WORKER_MEMORY_CHECK_INTERVAL: float = 5.0
+
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: Literal["json", "text"] = "json"
+    LOG_QUEUE_SIZE: int = 10000
+
+    TRACE_EXPORTER: Literal["none", "file", "otlp"] = "none"
+    TRACE_SAMPLE_RATE: float = Field(default=0.0, ge=0.0, le=1.0)
+    TRACE_FILE: str = "traces.jsonl"
+    TRACE_OTLP_ENDPOINT: str = "http://127.0.0.1:4318"
+    TRACE_SERVICE_NAME: str = "contacts-api"
+
+    model_config = SettingsConfigDict(
+        env_file=".env", env_file_encoding="utf-8", extra="ignore"
+    )
 
-    model_config = ConfigDict(extra="ignore")
+    @property
+    def cors_origins(self) -> list[str]:
+        return [origin for origin in self.CORS_ORIGINS.split(",") if origin]
 
 
 config = Config()
@@ -0,0 +1,143 @@
+import json
+import logging
+import queue
+import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from src.tracing import current_span
+
+request_id_var: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else was passed via `extra=` and is
+# emitted as a structured field. uvicorn adds an ANSI-coloured copy of its
+# messages.
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {
+    "message",
+    "asctime",
+    "color_message",
+}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Hands records to a background thread; drops them when the queue is full.
+
+    Only the message is rendered on the calling thread. Tracebacks and JSON
+    encoding happen in the listener, so an error storm costs the event loop a
+    queue put per record and never a write to a blocked stderr.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Context lives in contextvars of the emitting task, so capture it now.
+        record.request_id = request_id_var.get()
+        span = current_span()
+        if span is not None:
+            record.trace_id = span.trace_id
+            record.span_id = span.span_id
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+# uvicorn's default config gives these their own stderr handlers and stops
+# propagation, which would keep the access log writing synchronously.
+_SERVER_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+
+class LoggingState:
+    def __init__(self):
+        self.handler: NonBlockingQueueHandler | None = None
+        self.listener: QueueListener | None = None
+        self.output: logging.Handler | None = None
+
+    def stats(self) -> dict:
+        if self.handler is None:
+            return {"queued": False}
+        return {
+            "queued": True,
+            "queue_size": self.handler.queue.qsize(),
+            "dropped": self.handler.dropped,
+        }
+
+
+logging_state = LoggingState()
+
+
+def setup_logging(level: str = "INFO", fmt: str = "json", queue_size: int = 10000):
+    """Route the root logger through a bounded queue to a stderr writer thread.
+
+    Called per worker process from the lifespan: the listener thread does not
+    survive a fork.
+    """
+    if logging_state.listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stderr)
+    output.setFormatter(
+        JsonFormatter()
+        if fmt == "json"
+        else logging.Formatter(
+            "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"
+        )
+    )
+    handler = NonBlockingQueueHandler(queue.Queue(queue_size))
+    listener = QueueListener(handler.queue, output, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+    for name in _SERVER_LOGGERS:
+        server_logger = logging.getLogger(name)
+        for existing in list(server_logger.handlers):
+            server_logger.removeHandler(existing)
+        server_logger.propagate = True
+    listener.start()
+
+    logging_state.handler = handler
+    logging_state.listener = listener
+    logging_state.output = output
+
+
+def shutdown_logging():
+    # Flushes what is still queued. uvicorn still logs after the lifespan
+    # ends, so the root logger keeps writing, directly from here on.
+    if logging_state.listener is not None:
+        logging_state.listener.stop()
+        root = logging.getLogger()
+        root.removeHandler(logging_state.handler)
+        root.addHandler(logging_state.output)
+        logging_state.listener = None
+        logging_state.handler = None
@@ -1,8 +1,11 @@
+import asyncio
 import contextlib
+from typing import Awaitable, Callable
 
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
+    AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
@@ -11,10 +14,16 @@ from src.conf.config import config
 
 
 class DatabaseSessionManager:
-    def __init__(self, url: str):
-        self._engine: AsyncEngine | None = create_async_engine(url)
+    def __init__(self, url: str, **engine_options):
+        self._engine: AsyncEngine | None = create_async_engine(url, **engine_options)
+        # Not expired on commit: the request's user and contacts are still
+        # read after the write commits (events, cache invalidation, the
+        # response), and an expired attribute cannot lazy-load under asyncio.
         self._session_maker: async_sessionmaker = async_sessionmaker(
-            autoflush=False, autocommit=False, bind=self._engine
+            autoflush=False,
+            autocommit=False,
+            expire_on_commit=False,
+            bind=self._engine,
         )
 
     @contextlib.asynccontextmanager
@@ -30,8 +39,53 @@ class DatabaseSessionManager:
         finally:
             await session.close()
 
+    async def warm_up(
+        self,
+        connections: int,
+        warm_session: Callable[[AsyncSession], Awaitable[None]] | None = None,
+    ) -> int:
+        if self._engine is None:
+            raise Exception("Database engine is not initialized")
+        connections = min(connections, self._engine.pool.size())
+        if connections <= 0:
+            return 0
 
-sessionmanager = DatabaseSessionManager(config.DATABASE_URL)
+        # All connections are checked out at once so the pool really opens
+        # `connections` sockets instead of reusing the first one.
+        opened = await asyncio.gather(
+            *(self._engine.connect() for _ in range(connections)),
+            return_exceptions=True,
+        )
+        try:
+            for connection in opened:
+                if isinstance(connection, BaseException):
+                    raise connection
+            if warm_session is not None:
+                for connection in opened:
+                    async with AsyncSession(bind=connection) as session:
+                        await warm_session(session)
+                    await connection.rollback()
+        finally:
+            for connection in opened:
+                if not isinstance(connection, BaseException):
+                    await connection.close()
+        return connections
+
+    async def close(self):
+        if self._engine is None:
+            return
+        await self._engine.dispose()
+        self._engine = None
+        self._session_maker = None
+
+
+sessionmanager = DatabaseSessionManager(
+    config.DATABASE_URL,
+    pool_size=config.DB_POOL_SIZE,
+    max_overflow=config.DB_MAX_OVERFLOW,
+    pool_recycle=config.DB_POOL_RECYCLE,
+    pool_pre_ping=True,
+)
 
 
 async def get_db():
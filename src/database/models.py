@@ -1,4 +1,14 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, func
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Integer,
+    String,
+    ForeignKey,
+    Index,
+    Sequence,
+    func,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import DeclarativeBase, relationship
 from sqlalchemy.sql.sqltypes import Date, DateTime, Boolean
 
@@ -7,6 +17,11 @@ class Base(DeclarativeBase):
     pass
 
 
+# Shared by contacts and their tombstones so every change gets a position in a
+# single, monotonically increasing sync order.
+contact_sync_seq = Sequence("contact_sync_seq", metadata=Base.metadata)
+
+
 class Contact(Base):
     __tablename__ = "contacts"
 
@@ -15,12 +30,134 @@ class Contact(Base):
     last_name = Column(String(50), nullable=False)
     email = Column(String(100), unique=True, index=True, nullable=False)
     phone_number = Column(String(20), nullable=False)
+    # E.164 form of phone_number, NULL when it cannot be normalized.
+    phone_e164 = Column(String(16), nullable=True)
+    # Duplicate-detection blocking keys (src/services/dedupe.py); together
+    # with phone_e164 they decide which contacts are compared at all.
+    email_key = Column(String(100), nullable=True)
+    name_key = Column(String(120), nullable=True)
     birthday = Column(Date, nullable=True)
     additional_info = Column(String(255), nullable=True)
+    tags = Column(ARRAY(String(50)), server_default="{}", nullable=False)
     user_id = Column(
         "user_id", ForeignKey("users.id", ondelete="CASCADE"), default=None
     )
     user = relationship("User", backref="contacts")
+    updated_at = Column(
+        DateTime, server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+    sync_version = Column(
+        BigInteger,
+        server_default=contact_sync_seq.next_value(),
+        onupdate=contact_sync_seq.next_value(),
+        nullable=False,
+    )
+
+    __table_args__ = (
+        Index("ix_contacts_user_id_updated_at", "user_id", "updated_at"),
+        Index("ix_contacts_user_id_sync_version", "user_id", "sync_version"),
+        Index("ix_contacts_user_id_phone_e164", "user_id", "phone_e164"),
+        Index("ix_contacts_user_id_email_key", "user_id", "email_key"),
+        Index("ix_contacts_user_id_name_key", "user_id", "name_key"),
+        Index("ix_contacts_user_id_tags", "user_id", "tags", postgresql_using="gin"),
+        # text_pattern_ops lets `lower(col) LIKE 'prefix%'` use the index
+        # regardless of the database collation (typeahead suggestions).
+        Index(
+            "ix_contacts_user_id_lower_first_name",
+            "user_id",
+            func.lower(first_name).label("lower_first_name"),
+            postgresql_ops={"lower_first_name": "text_pattern_ops"},
+        ),
+        Index(
+            "ix_contacts_user_id_lower_last_name",
+            "user_id",
+            func.lower(last_name).label("lower_last_name"),
+            postgresql_ops={"lower_last_name": "text_pattern_ops"},
+        ),
+        Index(
+            "ix_contacts_user_id_lower_email",
+            "user_id",
+            func.lower(email).label("lower_email"),
+            postgresql_ops={"lower_email": "text_pattern_ops"},
+        ),
+    )
+    # Identify rows by (id, user_id) so ORM UPDATE/DELETE statements carry the
+    # partition key and keep partition pruning on the optional hash-partitioned
+    # layout (see migration 9e4b7d2a61c5).
+    __mapper_args__ = {"primary_key": [id, user_id]}
+
+
+class ContactTombstone(Base):
+    __tablename__ = "contact_tombstones"
+
+    contact_id = Column(Integer, primary_key=True, autoincrement=False)
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    sync_version = Column(
+        BigInteger, server_default=contact_sync_seq.next_value(), nullable=False
+    )
+    deleted_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_contact_tombstones_user_id_sync_version", "user_id", "sync_version"),
+        Index("ix_contact_tombstones_deleted_at", "deleted_at"),
+    )
+
+
+# Tombstones are purged after a retention period. This keeps, per user, the
+# newest sync_version purged: a sync token older than that may have missed
+# deletes, so the client has to start over.
+class ContactSyncHorizon(Base):
+    __tablename__ = "contact_sync_horizons"
+
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    purged_through = Column(BigInteger, nullable=False)
+
+
+# Deleted contacts are moved here so the hot table and its per-user indexes
+# only hold live rows. Derived columns are not archived; restore recomputes
+# them.
+class ContactArchive(Base):
+    __tablename__ = "contacts_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    first_name = Column(String(50), nullable=False)
+    last_name = Column(String(50), nullable=False)
+    email = Column(String(100), nullable=False)
+    phone_number = Column(String(20), nullable=False)
+    birthday = Column(Date, nullable=True)
+    additional_info = Column(String(255), nullable=True)
+    tags = Column(ARRAY(String(50)), server_default="{}", nullable=False)
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    updated_at = Column(DateTime, nullable=False)
+    deleted_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_contacts_archive_user_id_deleted_at", "user_id", "deleted_at"),
+        Index("ix_contacts_archive_deleted_at", "deleted_at"),
+    )
+
+
+# Mirrors Contact.tags one row per tag. The array with its GIN index answers
+# tag filters; this table answers per-tag counts from its primary key alone
+# (index-only scans).
+class ContactTag(Base):
+    __tablename__ = "contact_tags"
+
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    tag = Column(String(50), primary_key=True)
+    contact_id = Column(
+        Integer, ForeignKey("contacts.id", ondelete="CASCADE"), primary_key=True
+    )
+
+    __table_args__ = (Index("ix_contact_tags_contact_id", "contact_id"),)
 
 
 class User(Base):
@@ -33,3 +170,19 @@ class User(Base):
     created_at = Column(DateTime, default=func.now())
     avatar = Column(String(255), nullable=True)
     confirmed = Column(Boolean, default=False)
+
+
+class BirthdayDigest(Base):
+    __tablename__ = "birthday_digest"
+
+    contact_id = Column(
+        Integer, ForeignKey("contacts.id", ondelete="CASCADE"), primary_key=True
+    )
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    next_birthday = Column(Date, nullable=False)
+
+    __table_args__ = (
+        Index("ix_birthday_digest_user_id_next_birthday", "user_id", "next_birthday"),
+    )
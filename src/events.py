@@ -0,0 +1,318 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from typing import Callable
+
+from sqlalchemy.engine import make_url
+
+from src.conf.config import config as app_config
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ContactEvent:
+    user_id: int
+    action: str
+    contact_id: int
+    version: int | None = None
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, payload: str) -> "ContactEvent":
+        return cls(**json.loads(payload))
+
+
+class SubscriptionClosed(Exception):
+    pass
+
+
+_CLOSED = object()
+
+
+class Subscription:
+    def __init__(self, user_id: int, max_queue: int):
+        self.user_id = user_id
+        self.overflowed = False
+        # Set when events for this stream may have been lost; the client has
+        # to catch up through /contacts/changes.
+        self.missed_events = False
+        self.closed = False
+        self._queue: asyncio.Queue = asyncio.Queue(max_queue)
+
+    def offer(self, event: ContactEvent):
+        if self.closed:
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # The consumer is not keeping up. Rather than buffering without
+            # bound, drop the stream and let the client resync via /changes.
+            self.overflowed = True
+            self.missed_events = True
+            self.close()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(_CLOSED)
+
+    async def next_event(self, timeout: float) -> ContactEvent | None:
+        try:
+            item = await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if item is _CLOSED:
+            raise SubscriptionClosed
+        return item
+
+
+class InMemoryBackend:
+    name = "memory"
+
+    def __init__(self):
+        self._deliver: Callable[[ContactEvent], None] | None = None
+
+    async def start(
+        self,
+        deliver: Callable[[ContactEvent], None],
+        resync: Callable[[], None] | None = None,
+    ):
+        self._deliver = deliver
+
+    async def publish(self, event: ContactEvent):
+        if self._deliver is not None:
+            self._deliver(event)
+
+    async def stop(self):
+        self._deliver = None
+
+
+class PostgresNotifyBackend:
+    name = "postgres"
+    channel = "contact_events"
+
+    def __init__(self, database_url: str):
+        self.dsn = (
+            make_url(database_url)
+            .set(drivername="postgresql")
+            .render_as_string(hide_password=False)
+        )
+        self._connection = None
+        self._deliver: Callable[[ContactEvent], None] | None = None
+        self._resync: Callable[[], None] | None = None
+        self._lock = asyncio.Lock()
+        self._reconnecting: asyncio.Task | None = None
+        self.reconnects = 0
+
+    async def start(
+        self,
+        deliver: Callable[[ContactEvent], None],
+        resync: Callable[[], None] | None = None,
+    ):
+        self._deliver = deliver
+        self._resync = resync
+        await self._connect()
+
+    async def _connect(self):
+        import asyncpg
+
+        connection = await asyncpg.connect(self.dsn)
+        await connection.add_listener(self.channel, self._on_notify)
+        connection.add_termination_listener(self._on_terminated)
+        self._connection = connection
+
+    def _on_notify(self, connection, pid, channel, payload):
+        if self._deliver is not None:
+            self._deliver(ContactEvent.from_json(payload))
+
+    def _on_terminated(self, connection):
+        # Without LISTEN this worker would stop hearing about other workers'
+        # writes for good, streams and cache invalidation alike.
+        if self._deliver is None or connection is not self._connection:
+            return
+        if self._reconnecting is None or self._reconnecting.done():
+            self._reconnecting = asyncio.ensure_future(self._reconnect())
+
+    async def _reconnect(self):
+        delay = 0.5
+        while self._deliver is not None:
+            try:
+                async with self._lock:
+                    if self._connection is None or self._connection.is_closed():
+                        await self._connect()
+            except Exception as e:
+                logger.warning(
+                    "LISTEN connection lost, retrying in %.1f s: %s", delay, e
+                )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+                continue
+
+            self.reconnects += 1
+            logger.info("LISTEN connection re-established")
+            # Events sent while the connection was down are gone.
+            if self._resync is not None:
+                self._resync()
+            return
+
+    async def publish(self, event: ContactEvent):
+        # NOTIFY is delivered back to this worker's own listener as well, so
+        # local subscribers are served by _on_notify like every other worker.
+        async with self._lock:
+            if self._connection is None or self._connection.is_closed():
+                await self._connect()
+            await self._connection.execute(
+                "SELECT pg_notify($1, $2)", self.channel, event.to_json()
+            )
+
+    async def stop(self):
+        self._deliver = None
+        self._resync = None
+        if self._reconnecting is not None:
+            self._reconnecting.cancel()
+            self._reconnecting = None
+        if self._connection is not None and not self._connection.is_closed():
+            await self._connection.close()
+        self._connection = None
+
+
+class ContactEventBroker:
+    def __init__(self, backend, max_queue: int):
+        self.backend = backend
+        self.max_queue = max_queue
+        self.published = 0
+        self.delivered = 0
+        self.dropped_subscribers = 0
+        self.resyncs = 0
+        self.closing = False
+        self._subscriptions: dict[int, set[Subscription]] = defaultdict(set)
+        self._listeners: list[Callable[[ContactEvent], None]] = []
+        self._resync_listeners: list[Callable[[], None]] = []
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(subs) for subs in self._subscriptions.values())
+
+    async def start(self):
+        self.closing = False
+        await self.backend.start(self._deliver, self._resync)
+
+    async def stop(self):
+        await self.backend.stop()
+        self.close_subscriptions()
+
+    def close_subscriptions(self):
+        # Open streams never finish on their own, and the server waits for
+        # every connection to close before it shuts the app down. Closing the
+        # subscriptions ends the streams; clients reconnect to another worker.
+        self.closing = True
+        for subscriptions in list(self._subscriptions.values()):
+            for subscription in list(subscriptions):
+                subscription.close()
+
+    def check_coherence(self, workers: int, configured: str | None) -> bool:
+        """Share events through Postgres when several workers need them.
+
+        An in-memory backend only reaches streams and cache listeners in the
+        process that handled the write. Left unset, EVENTS_BACKEND becomes
+        postgres with more than one worker; set to memory explicitly, it is
+        kept and reported as incoherent.
+        """
+        if workers <= 1 or not isinstance(self.backend, InMemoryBackend):
+            return True
+        if configured is None:
+            self.backend = PostgresNotifyBackend(app_config.DATABASE_URL)
+            return True
+        return False
+
+    def add_listener(
+        self,
+        listener: Callable[[ContactEvent], None],
+        on_resync: Callable[[], None] | None = None,
+    ):
+        self._listeners.append(listener)
+        if on_resync is not None:
+            self._resync_listeners.append(on_resync)
+
+    def subscribe(self, user_id: int) -> Subscription:
+        subscription = Subscription(user_id, self.max_queue)
+        if self.closing:
+            subscription.close()
+            return subscription
+        self._subscriptions[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscriptions = self._subscriptions.get(subscription.user_id)
+        if subscriptions is None:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscriptions[subscription.user_id]
+
+    async def publish(self, event: ContactEvent):
+        # The change is already committed; a failed notification must not
+        # turn the request into an error.
+        try:
+            await self.backend.publish(event)
+            self.published += 1
+        except Exception:
+            logger.exception("Failed to publish %s", event)
+
+    def _deliver(self, event: ContactEvent):
+        for listener in self._listeners:
+            listener(event)
+        for subscription in list(self._subscriptions.get(event.user_id, ())):
+            subscription.offer(event)
+            if subscription.overflowed:
+                self.dropped_subscribers += 1
+                self.unsubscribe(subscription)
+            else:
+                self.delivered += 1
+
+    def _resync(self):
+        # The backend may have lost events: listeners drop what they derived
+        # from them, and every stream is told to catch up through /changes.
+        self.resyncs += 1
+        for on_resync in self._resync_listeners:
+            on_resync()
+        for subscriptions in list(self._subscriptions.values()):
+            for subscription in list(subscriptions):
+                subscription.missed_events = True
+                subscription.close()
+                self.unsubscribe(subscription)
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend.name,
+            "subscribers": self.subscriber_count,
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped_subscribers": self.dropped_subscribers,
+            "resyncs": self.resyncs,
+        }
+
+
+def create_backend(name: str | None):
+    # Unset starts in memory; check_coherence() switches to postgres once the
+    # worker count is known.
+    if name is None:
+        return InMemoryBackend()
+    if name == "postgres":
+        return PostgresNotifyBackend(app_config.DATABASE_URL)
+    if name == "memory":
+        return InMemoryBackend()
+    raise ValueError(f"Unknown events backend: {name}")
+
+
+contact_events = ContactEventBroker(
+    create_backend(app_config.EVENTS_BACKEND), app_config.EVENTS_QUEUE_SIZE
+)
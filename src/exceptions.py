@@ -8,7 +8,7 @@ logger = logging.getLogger(__name__)
 
 
 async def validation_exception_handler(request: Request, exc: ValidationError):
-    logger.error(f"Validation Error: {exc.errors()}")
+    logger.error("Validation Error: %s", exc.errors())
     return JSONResponse(
         status_code=400,  # Convert 422 -> 400 Bad Request for consistency
         content={"detail": exc.errors()},
@@ -16,7 +16,7 @@ async def validation_exception_handler(request: Request, exc: ValidationError):
 
 
 async def integrity_exception_handler(request: Request, exc: IntegrityError):
-    logger.error(f"Integrity Error: {str(exc)}")
+    logger.error("Integrity Error: %s", exc)
     return JSONResponse(
         status_code=400,
         content={"detail": "A record with this unique value already exists."},
@@ -24,7 +24,7 @@ async def integrity_exception_handler(request: Request, exc: IntegrityError):
 
 
 async def not_found_exception_handler(request: Request, exc: HTTPException):
-    logger.warning(f"Not Found: {request.url} - {exc.detail}")
+    logger.warning("Not Found: %s - %s", request.url.path, exc.detail)
     return JSONResponse(
         status_code=exc.status_code,
         content={"detail": exc.detail or "Resource not found"},
@@ -32,7 +32,14 @@ async def not_found_exception_handler(request: Request, exc: HTTPException):
 
 
 async def general_exception_handler(request: Request, exc: Exception):
-    logger.error(f"Unhandled Exception: {str(exc)}", exc_info=True)
+    # The traceback is formatted on the log listener thread, not here.
+    logger.error(
+        "Unhandled Exception on %s %s: %s",
+        request.method,
+        request.url.path,
+        exc,
+        exc_info=exc,
+    )
     return JSONResponse(
         status_code=500,
         content={"detail": "An internal server error occurred."},
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import signal
+import threading
+from contextlib import asynccontextmanager
+from datetime import time
+
+from fastapi import FastAPI
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.conf.config import config as app_config
+from src.conf.logging_config import setup_logging, shutdown_logging
+from src.database.db import sessionmanager
+from src.database.models import User
+from src.events import contact_events
+from src.repository.contacts import ContactRepository
+from src.repository.users import UserRepository
+from src.services.archive import purge_contact_archive, purge_contact_tombstones
+from src.services.birthdays import refresh_birthday_digest
+from src.services.cache import contact_cache
+from src.services.scheduler import run_daily
+from src.tracing import tracer
+from src.worker import worker_state
+
+logger = logging.getLogger(__name__)
+
+
+async def warm_hot_queries(session: AsyncSession):
+    # Running the real repository methods primes SQLAlchemy's compiled cache
+    # and asyncpg's per-connection prepared statement cache with the exact SQL
+    # the request path will send. No row matches user id 0.
+    placeholder = User(id=0)
+    contacts = ContactRepository(session)
+    await contacts.get_contacts(user=placeholder)
+    await contacts.get_contact_by_id(0, placeholder)
+    await contacts.get_upcoming_birthdays(7, 0, 100, placeholder)
+    await contacts.suggest_contacts("a", 10, placeholder)
+
+    users = UserRepository(session)
+    await users.get_user_by_username("")
+    await users.get_user_by_email("")
+
+
+def close_streams_on_exit_signals() -> dict:
+    # The lifespan shutdown below only runs once every connection has closed,
+    # and change streams stay open until told otherwise. Chain onto the
+    # server's SIGINT/SIGTERM handlers so the streams end as soon as shutdown
+    # begins, whichever server runs the app.
+    if threading.current_thread() is not threading.main_thread():
+        return {}
+    loop = asyncio.get_running_loop()
+    previous = {}
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        handler = signal.getsignal(sig)
+        if not callable(handler):
+            continue
+
+        def on_exit_signal(signum, frame, handler=handler):
+            loop.call_soon_threadsafe(contact_events.close_subscriptions)
+            handler(signum, frame)
+
+        previous[sig] = signal.signal(sig, on_exit_signal)
+    return previous
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Per worker: the log writer thread does not survive a fork.
+    setup_logging(
+        app_config.LOG_LEVEL, app_config.LOG_FORMAT, app_config.LOG_QUEUE_SIZE
+    )
+
+    try:
+        warmed = await sessionmanager.warm_up(
+            app_config.DB_WARMUP_CONNECTIONS, warm_hot_queries
+        )
+        logger.info("Warmed %d pooled database connections", warmed)
+    except (SQLAlchemyError, OSError) as e:
+        logger.warning("Database warm-up skipped: %s", e)
+
+    if not contact_events.check_coherence(
+        worker_state.workers, app_config.EVENTS_BACKEND
+    ):
+        logger.warning(
+            "EVENTS_BACKEND=memory with %d workers: change streams only see "
+            "writes handled by their own worker (unset it or use postgres)",
+            worker_state.workers,
+        )
+    await contact_events.start()
+    previous_handlers = close_streams_on_exit_signals()
+    if not contact_cache.check_coherence(
+        worker_state.workers, contact_events.backend.name
+    ):
+        logger.warning(
+            "In-process contact cache disabled: %d workers share no invalidation "
+            "channel (set CACHE_REDIS_URL or EVENTS_BACKEND=postgres)",
+            worker_state.workers,
+        )
+
+    # Scheduled jobs are idempotent, but only the first worker runs them so a
+    # multi-process server does not repeat the work per process.
+    jobs = []
+    if worker_state.index == 0:
+        jobs.append(
+            asyncio.create_task(run_daily("birthday-digest", refresh_birthday_digest))
+        )
+        jobs.append(
+            asyncio.create_task(
+                run_daily("contact-archive-purge", purge_contact_archive, at=time(3, 0))
+            )
+        )
+        jobs.append(
+            asyncio.create_task(
+                run_daily(
+                    "contact-tombstone-purge", purge_contact_tombstones, at=time(3, 30)
+                )
+            )
+        )
+
+    yield
+
+    for job in jobs:
+        job.cancel()
+    await asyncio.gather(*jobs, return_exceptions=True)
+
+    for sig, handler in previous_handlers.items():
+        signal.signal(sig, handler)
+    # uvicorn has already drained the connections (timeout_graceful_shutdown)
+    # before it runs this part.
+    await contact_events.stop()
+    await sessionmanager.close()
+
+    # Blocking joins, but by now nothing else is running on the loop.
+    tracer.shutdown()
+    shutdown_logging()
@@ -0,0 +1,328 @@
+import asyncio
+import re
+import time
+import uuid
+from collections import deque
+
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.conf.config import config as app_config
+from src.conf.logging_config import request_id_var
+from src.exceptions import general_exception_handler
+from src.tracing import parse_traceparent, tracer
+
+
+class InFlightTracker:
+    def __init__(self):
+        self.active = 0
+        self.total = 0
+
+    def enter(self):
+        self.active += 1
+        self.total += 1
+
+    def exit(self):
+        self.active -= 1
+
+
+in_flight = InFlightTracker()
+
+
+async def send_unavailable(send: Send, detail: bytes, headers: list):
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [(b"content-type", b"application/json"), *headers],
+        }
+    )
+    await send({"type": "http.response.body", "body": b'{"detail":"%s"}' % detail})
+
+
+# Request counters for /healthcheck/worker. Draining on shutdown is uvicorn's
+# job: it stops accepting connections and waits up to timeout_graceful_shutdown
+# for running requests, including BackgroundTasks (e.g. confirmation emails)
+# that Starlette runs before the ASGI call returns.
+class InFlightMiddleware:
+    def __init__(self, app: ASGIApp, tracker: InFlightTracker = in_flight):
+        self.app = app
+        self.tracker = tracker
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        self.tracker.enter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.tracker.exit()
+
+
+# AIMD: the limit grows by about one per window of successful requests and is
+# cut by `backoff` when responses get slower than `latency_target` or fail with
+# a 5xx. Requests over the limit wait in a bounded FIFO queue for at most
+# `queue_timeout`; beyond that they are rejected right away, so a slow database
+# turns into fast 503s instead of a pile-up of pool checkouts.
+class AIMDLimiter:
+    def __init__(
+        self,
+        name: str,
+        latency_target: float,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        max_queue: int,
+        queue_timeout: float,
+        backoff: float = 0.9,
+    ):
+        self.name = name
+        self.latency_target = latency_target
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.backoff = backoff
+        self.in_flight = 0
+        self.accepted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.decreases = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+
+    async def acquire(self) -> bool:
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            self.accepted += 1
+            return True
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            if not waiter.done() or waiter.cancelled():
+                self.rejected += 1
+                return False
+            # A slot was handed over just as the wait timed out.
+        except asyncio.CancelledError:
+            # The client went away after a slot was handed over.
+            if waiter.done() and not waiter.cancelled():
+                self._release_slot()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        self.accepted += 1
+        return True
+
+    def release(self, latency: float, failed: bool):
+        now = time.monotonic()
+        if failed or latency > self.latency_target:
+            # One cut per latency window, so a burst of slow responses that
+            # started under the old limit does not collapse it.
+            if now - self._last_decrease > self.latency_target:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_decrease = now
+                self.decreases += 1
+        elif self.in_flight >= int(self.limit):
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        self._release_slot()
+
+    def _release_slot(self):
+        # Wake the oldest waiters, as many as the (possibly grown) limit allows.
+        self.in_flight -= 1
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def stats(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "latency_target_ms": round(self.latency_target * 1000),
+            "accepted": self.accepted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "decreases": self.decreases,
+        }
+
+
+# POST endpoints that only read.
+_READ_POSTS = ("/contacts/multi-get", "/contacts/lookup")
+# Long-lived streams would hold a slot for hours and skew the latency signal.
+_UNLIMITED = ("/contacts/stream",)
+
+
+def route_class(scope: Scope) -> str | None:
+    path = scope["path"]
+    if path.startswith("/auth"):
+        return "auth"
+    if not path.startswith("/contacts") or path in _UNLIMITED:
+        return None
+    if scope["method"] in ("GET", "HEAD") or path in _READ_POSTS:
+        return "contacts_read"
+    return "contacts_write"
+
+
+def _create_limiters() -> dict[str, AIMDLimiter]:
+    targets = {
+        "auth": app_config.CONCURRENCY_TARGET_AUTH_MS,
+        "contacts_read": app_config.CONCURRENCY_TARGET_READ_MS,
+        "contacts_write": app_config.CONCURRENCY_TARGET_WRITE_MS,
+    }
+    return {
+        name: AIMDLimiter(
+            name,
+            latency_target=target_ms / 1000,
+            initial_limit=app_config.DB_POOL_SIZE + app_config.DB_MAX_OVERFLOW,
+            min_limit=app_config.CONCURRENCY_MIN_LIMIT,
+            max_limit=app_config.CONCURRENCY_MAX_LIMIT,
+            max_queue=app_config.CONCURRENCY_MAX_QUEUE,
+            queue_timeout=app_config.CONCURRENCY_QUEUE_TIMEOUT,
+        )
+        for name, target_ms in targets.items()
+    }
+
+
+concurrency_limiters = _create_limiters()
+
+
+def concurrency_stats() -> dict:
+    return {
+        "enabled": app_config.CONCURRENCY_LIMIT_ENABLED,
+        **{name: limiter.stats() for name, limiter in concurrency_limiters.items()},
+    }
+
+
+class AdaptiveConcurrencyMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiters: dict[str, AIMDLimiter] = concurrency_limiters,
+        retry_after: int | None = None,
+    ):
+        self.app = app
+        self.limiters = limiters
+        self.retry_after = str(
+            retry_after or app_config.CONCURRENCY_RETRY_AFTER_SECONDS
+        ).encode()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        limiter = None
+        if scope["type"] == "http":
+            limiter = self.limiters.get(route_class(scope))
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await limiter.acquire():
+            await send_unavailable(
+                send, b"Server is overloaded", [(b"retry-after", self.retry_after)]
+            )
+            return
+
+        started = time.monotonic()
+        status = 500
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                limiter.release(time.monotonic() - started, status >= 500)
+
+        # The slot is freed once the response is sent; background tasks that
+        # run afterwards (emails) do not hold it.
+        async def send_wrapper(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get(
+                "more_body", False
+            ):
+                release()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            release()
+
+
+_REQUEST_ID = re.compile(rb"^[A-Za-z0-9._-]{1,128}$")
+
+
+class RequestContextMiddleware:
+    """Request id and root "api" span for every HTTP request.
+
+    An incoming X-Request-ID (or W3C traceparent) is reused so ids line up
+    with the caller's logs; otherwise one is generated. The id is echoed in the
+    X-Request-ID response header.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        incoming = headers.get(b"x-request-id")
+        if incoming and _REQUEST_ID.match(incoming):
+            request_id = incoming.decode()
+        else:
+            request_id = uuid.uuid4().hex
+        request_id_var.set(request_id)
+
+        method = scope["method"]
+        with tracer.span(
+            f"{method} {scope['path']}",
+            {"http.method": method, "request.id": request_id},
+            parent=parse_traceparent(headers.get(b"traceparent")),
+        ) as span:
+            started = False
+
+            async def send_wrapper(message: Message):
+                nonlocal started
+                if message["type"] == "http.response.start":
+                    started = True
+                    message["headers"] = [
+                        *message.get("headers", ()),
+                        (b"x-request-id", request_id.encode()),
+                    ]
+                    if span is not None:
+                        span.attributes["http.status_code"] = message["status"]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            except Exception as e:
+                # Answered here rather than by Starlette's ServerErrorMiddleware,
+                # which sits outside this one, so the 500 still carries
+                # X-Request-ID and the error is logged inside the span.
+                if started:
+                    raise
+                if span is not None:
+                    span.error = f"{type(e).__name__}: {e}"
+                response = await general_exception_handler(Request(scope), e)
+                await response(scope, receive, send_wrapper)
+            finally:
+                # Named after the route template once routing has run, so
+                # "/contacts/{contact_id}" is one span name, not one per id.
+                route = scope.get("route")
+                if span is not None and route is not None:
+                    span.name = f"{method} {route.path}"
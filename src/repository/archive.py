@@ -0,0 +1,127 @@
+from datetime import timedelta
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.models import Contact, ContactArchive, User
+from src.tracing import traced
+
+contacts_table = Contact.__table__
+archive_table = ContactArchive.__table__
+
+# Columns carried over between the hot table and the archive. Everything else
+# on contacts is either assigned by the database or derived from these.
+ARCHIVED_COLUMNS = [c.name for c in archive_table.c if c.name in contacts_table.c]
+RESTORED_COLUMNS = [name for name in ARCHIVED_COLUMNS if name != "updated_at"]
+
+
+@traced("repository")
+class ContactArchiveRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def archive_contact(
+        self, contact_id: int, user: User
+    ) -> Optional[ContactArchive]:
+        # WITH moved AS (DELETE ... RETURNING ...) INSERT ... SELECT FROM moved:
+        # one statement, so the row is never in both tables or in neither.
+        moved = (
+            delete(contacts_table)
+            .where(
+                contacts_table.c.id == contact_id, contacts_table.c.user_id == user.id
+            )
+            .returning(*[contacts_table.c[name] for name in ARCHIVED_COLUMNS])
+            .cte("moved")
+        )
+        stmt = (
+            insert(archive_table)
+            .from_select(
+                ARCHIVED_COLUMNS, select(*[moved.c[name] for name in ARCHIVED_COLUMNS])
+            )
+            .returning(*archive_table.c)
+            .add_cte(moved)
+        )
+        result = await self.db.execute(select(ContactArchive).from_statement(stmt))
+        return result.scalar_one_or_none()
+
+    async def restore_contact(self, contact_id: int, user: User) -> Optional[Contact]:
+        restored = (
+            delete(archive_table)
+            .where(archive_table.c.id == contact_id, archive_table.c.user_id == user.id)
+            .returning(*[archive_table.c[name] for name in RESTORED_COLUMNS])
+            .cte("restored")
+        )
+        # updated_at and sync_version take their defaults, so the restore shows
+        # up as a fresh change in /contacts/changes.
+        stmt = (
+            insert(contacts_table)
+            .from_select(
+                RESTORED_COLUMNS,
+                select(*[restored.c[name] for name in RESTORED_COLUMNS]),
+            )
+            .returning(*contacts_table.c)
+            .add_cte(restored)
+        )
+        result = await self.db.execute(select(Contact).from_statement(stmt))
+        return result.scalar_one_or_none()
+
+    async def get_archived(self, skip: int, limit: int, user: User):
+        stmt = (
+            select(ContactArchive)
+            .filter(ContactArchive.user_id == user.id)
+            .order_by(ContactArchive.deleted_at.desc(), ContactArchive.id.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        total_count_stmt = (
+            select(func.count())
+            .select_from(ContactArchive)
+            .filter(ContactArchive.user_id == user.id)
+        )
+
+        total_count = (await self.db.execute(total_count_stmt)).scalar()
+        contacts = (await self.db.execute(stmt)).scalars().all()
+
+        return {
+            "total_count": total_count,
+            "skip": skip,
+            "limit": limit,
+            "contacts": contacts,
+        }
+
+    async def purge_contact(self, contact_id: int, user: User) -> Optional[int]:
+        stmt = (
+            delete(ContactArchive)
+            .filter(ContactArchive.id == contact_id, ContactArchive.user_id == user.id)
+            .returning(ContactArchive.id)
+            .execution_options(synchronize_session=False)
+        )
+        purged = (await self.db.execute(stmt)).scalar_one_or_none()
+        await self.db.commit()
+        return purged
+
+    async def purge_expired(self, older_than: timedelta, batch_size: int) -> int:
+        # Small batches, each in its own transaction, keep row locks short.
+        # SKIP LOCKED leaves rows that a concurrent restore or purge holds for
+        # the next run instead of queueing behind it.
+        batch = (
+            select(ContactArchive.id)
+            .filter(ContactArchive.deleted_at < func.now() - older_than)
+            .order_by(ContactArchive.deleted_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            delete(ContactArchive)
+            .filter(ContactArchive.id.in_(batch.scalar_subquery()))
+            .execution_options(synchronize_session=False)
+        )
+
+        purged = 0
+        while True:
+            deleted = (await self.db.execute(stmt)).rowcount
+            await self.db.commit()
+            purged += deleted
+            if deleted < batch_size:
+                return purged
@@ -0,0 +1,139 @@
+from datetime import date, timedelta
+
+from sqlalchemy import delete, func, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.models import BirthdayDigest, Contact, User
+from src.tracing import traced
+
+
+def _birthday_in_year(birthday: date, year: int) -> date:
+    try:
+        return birthday.replace(year=year)
+    except ValueError:  # 29 February outside a leap year
+        return date(year, 2, 28)
+
+
+def next_birthday(birthday: date, today: date) -> date:
+    upcoming = _birthday_in_year(birthday, today.year)
+    if upcoming < today:
+        upcoming = _birthday_in_year(birthday, today.year + 1)
+    return upcoming
+
+
+def _upsert_statement():
+    stmt = insert(BirthdayDigest)
+    return stmt.on_conflict_do_update(
+        index_elements=[BirthdayDigest.contact_id],
+        set_={
+            "user_id": stmt.excluded.user_id,
+            "next_birthday": stmt.excluded.next_birthday,
+        },
+    )
+
+
+@traced("repository")
+class BirthdayDigestRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def sync_contact(self, contact: Contact, today: date | None = None):
+        if contact.birthday is None or contact.user_id is None:
+            await self.db.execute(
+                delete(BirthdayDigest).filter_by(contact_id=contact.id)
+            )
+            return
+
+        today = today or date.today()
+        await self.db.execute(
+            _upsert_statement(),
+            [
+                {
+                    "contact_id": contact.id,
+                    "user_id": contact.user_id,
+                    "next_birthday": next_birthday(contact.birthday, today),
+                }
+            ],
+        )
+
+    async def get_upcoming(
+        self,
+        days: int,
+        skip: int,
+        limit: int,
+        user: User,
+        today: date | None = None,
+        filters: list | None = None,
+    ):
+        today = today or date.today()
+        window = (
+            BirthdayDigest.user_id == user.id,
+            BirthdayDigest.next_birthday >= today,
+            BirthdayDigest.next_birthday <= today + timedelta(days=days),
+        )
+
+        stmt = (
+            select(Contact)
+            .join(BirthdayDigest, BirthdayDigest.contact_id == Contact.id)
+            .filter(Contact.user_id == user.id, *window, *(filters or ()))
+            .order_by(BirthdayDigest.next_birthday, Contact.id)
+            .offset(skip)
+            .limit(limit)
+        )
+        total_count_stmt = (
+            select(func.count()).select_from(BirthdayDigest).filter(*window)
+        )
+        if filters:
+            # Filters on contact columns need the join; plain counts do not.
+            total_count_stmt = total_count_stmt.join(
+                Contact, BirthdayDigest.contact_id == Contact.id
+            ).filter(Contact.user_id == user.id, *filters)
+
+        total_count = (await self.db.execute(total_count_stmt)).scalar()
+        contacts = (await self.db.execute(stmt)).scalars().all()
+
+        return {
+            "total_count": total_count,
+            "skip": skip,
+            "limit": limit,
+            "contacts": contacts,
+        }
+
+    async def refresh(self, today: date, batch_size: int) -> int:
+        # Fills in contacts that have no digest row yet and rolls rows whose
+        # birthday has passed forward to the next occurrence.
+        stale_stmt = (
+            select(Contact.id, Contact.user_id, Contact.birthday)
+            .outerjoin(BirthdayDigest, BirthdayDigest.contact_id == Contact.id)
+            .filter(
+                Contact.birthday.is_not(None),
+                Contact.user_id.is_not(None),
+                or_(
+                    BirthdayDigest.contact_id.is_(None),
+                    BirthdayDigest.next_birthday < today,
+                ),
+            )
+            .order_by(Contact.id)
+            .limit(batch_size)
+        )
+
+        refreshed = 0
+        while True:
+            rows = (await self.db.execute(stale_stmt)).all()
+            if not rows:
+                return refreshed
+
+            await self.db.execute(
+                _upsert_statement(),
+                [
+                    {
+                        "contact_id": contact_id,
+                        "user_id": user_id,
+                        "next_birthday": next_birthday(birthday, today),
+                    }
+                    for contact_id, user_id, birthday in rows
+                ],
+            )
+            await self.db.commit()
+            refreshed += len(rows)
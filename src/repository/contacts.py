@@ -1,43 +1,81 @@
+from datetime import timedelta
 from typing import Optional, Sequence
 
 from fastapi import HTTPException
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import func, and_, extract, or_
-from datetime import date, timedelta
+from sqlalchemy import (
+    Integer,
+    String,
+    func,
+    and_,
+    or_,
+    any_,
+    case,
+    delete,
+    literal,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import UnaryExpression
 
-from src.database.models import Contact, User
+from src.database.models import (
+    Contact,
+    ContactArchive,
+    ContactSyncHorizon,
+    ContactTombstone,
+    User,
+    contact_sync_seq,
+)
+from src.events import ContactEvent, contact_events
+from src.repository.archive import ContactArchiveRepository
+from src.repository.birthdays import BirthdayDigestRepository
+from src.repository.duplicates import DuplicateRepository
+from src.repository.tags import ContactTagRepository, tag_filters
 from src.schemas import ContactCreate, ContactUpdate
+from src.services.dedupe import email_key, name_key
+from src.services.phones import normalize_phone
+from src.tracing import traced
 
+# Class id for pg_advisory_xact_lock(class, user_id), held by every contact
+# write of a user until it commits.
+SYNC_LOCK_CLASS = 1
 
-def _birthday_filter_conditions(today, future_date):
-    if today.month == future_date.month:
-        return and_(
-            extract("month", Contact.birthday) == today.month,
-            extract("day", Contact.birthday) >= today.day,
-            extract("day", Contact.birthday) <= future_date.day,
-        )
-    else:
-        return or_(
-            and_(
-                extract("month", Contact.birthday) == today.month,
-                extract("day", Contact.birthday) >= today.day,
-            ),
-            and_(
-                extract("month", Contact.birthday) == future_date.month,
-                extract("day", Contact.birthday) <= future_date.day,
-            ),
-            and_(
-                extract("month", Contact.birthday) > today.month,
-                extract("month", Contact.birthday) < future_date.month,
-            ),
-        )
+
+def _prefix_pattern(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{escaped}%"
+
+
+def _starts_with(column, term: str):
+    return column.like(_prefix_pattern(term), escape="\\")
 
 
+def _pattern_order(expression):
+    # The sort order of the text_pattern_ops prefix indexes, so the rows can be
+    # read straight off the index. An exact match sorts before every longer
+    # word with the same prefix.
+    return UnaryExpression(expression, modifier=operators.custom_op("USING ~<~"))
+
+
+def _apply_derived_fields(contact: Contact):
+    # Columns computed from user-entered data. The archive does not keep them,
+    # so restore runs this as well.
+    contact.phone_e164 = normalize_phone(contact.phone_number)
+    contact.email_key = email_key(contact.email)
+    contact.name_key = name_key(contact.first_name, contact.last_name)
+
+
+@traced("repository")
 class ContactRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.birthdays = BirthdayDigestRepository(db)
+        self.archive = ContactArchiveRepository(db)
+        self.duplicates = DuplicateRepository(db)
+        self.tags = ContactTagRepository(db)
 
     async def _execute_and_fetch(self, stmt):
         result = await self.db.execute(stmt)
@@ -47,7 +85,18 @@ class ContactRepository:
         result = await self.db.execute(stmt)
         return result.scalar()
 
+    async def _lock_sync_versions(self, user: User):
+        # sync_version comes from a sequence when the row is written, not when
+        # it commits. Without this lock a later version of the same user could
+        # commit first, a delta sync would hand out its version as the token
+        # and the earlier change would never be synced. Taken before any
+        # nextval, it makes one user's versions commit in order.
+        await self.db.execute(
+            select(func.pg_advisory_xact_lock(SYNC_LOCK_CLASS, user.id))
+        )
+
     async def create_contact(self, contact_data: ContactCreate, user: User) -> Contact:
+        await self._lock_sync_versions(user)
         existing_contact_stmt = select(Contact).filter_by(email=contact_data.email)
         existing_contact_result = await self.db.execute(existing_contact_stmt)
         existing_contact = existing_contact_result.scalar_one_or_none()
@@ -56,11 +105,23 @@ class ContactRepository:
             raise ValueError(f"Contact with email {contact_data.email} already exists.")
 
         contact = Contact(**contact_data.model_dump(exclude_unset=True), user=user)
+        _apply_derived_fields(contact)
         self.db.add(contact)
+        await self.db.flush()
+        await self.birthdays.sync_contact(contact)
+        await self.tags.sync_contact(contact)
         await self.db.commit()
         await self.db.refresh(contact)
+        await self._publish("created", contact.id, contact.sync_version, user)
         return contact
 
+    async def _publish(self, action: str, contact_id: int, version: int, user: User):
+        await contact_events.publish(
+            ContactEvent(
+                user_id=user.id, action=action, contact_id=contact_id, version=version
+            )
+        )
+
     async def get_contacts(
         self,
         skip: int = 0,
@@ -69,10 +130,12 @@ class ContactRepository:
         last_name: Optional[str] = None,
         email: Optional[str] = None,
         user: User = None,
+        tags: Optional[Sequence[str]] = None,
+        any_tags: Optional[Sequence[str]] = None,
     ):
         stmt = select(Contact).filter_by(user=user)
 
-        filters = []
+        filters = tag_filters(tags, any_tags)
         if first_name:
             filters.append(Contact.first_name.ilike(f"%{first_name}%"))
         if last_name:
@@ -106,29 +169,231 @@ class ContactRepository:
         result = await self.db.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_contacts_by_ids(
+        self, contact_ids: Sequence[int], user: User
+    ) -> Sequence[Contact]:
+        # A single array parameter keeps the SQL text identical for any number
+        # of ids, so the prepared statement is reused.
+        stmt = select(Contact).filter(
+            Contact.user_id == user.id,
+            Contact.id == any_(literal(list(contact_ids), ARRAY(Integer))),
+        )
+        return await self._execute_and_fetch(stmt)
+
+    async def get_contacts_by_phones(
+        self, phones_e164: Sequence[str], user: User
+    ) -> Sequence[Contact]:
+        stmt = select(Contact).filter(
+            Contact.user_id == user.id,
+            Contact.phone_e164 == any_(literal(list(phones_e164), ARRAY(String))),
+        )
+        return await self._execute_and_fetch(stmt)
+
     async def update_contact(
         self, contact_id: int, contact_data: ContactUpdate, user: User
     ) -> Optional[Contact]:
+        await self._lock_sync_versions(user)
         contact = await self.get_contact_by_id(contact_id, user)
         if contact is None:
             raise ValueError("Contact not found")
 
-        for key, value in contact_data.model_dump(exclude_unset=True).items():
+        changes = contact_data.model_dump(exclude_unset=True)
+        for key, value in changes.items():
             setattr(contact, key, value)
+        _apply_derived_fields(contact)
 
+        if "birthday" in changes or "tags" in changes:
+            await self.db.flush()
+        if "birthday" in changes:
+            await self.birthdays.sync_contact(contact)
+        if "tags" in changes:
+            await self.tags.sync_contact(contact)
         await self.db.commit()
         await self.db.refresh(contact)
+        await self._publish("updated", contact.id, contact.sync_version, user)
         return contact
 
-    async def delete_contact(self, contact_id: int, user: User) -> Optional[Contact]:
-        contact = await self.get_contact_by_id(contact_id, user)
+    async def delete_contact(
+        self, contact_id: int, user: User
+    ) -> Optional[ContactArchive]:
+        await self._lock_sync_versions(user)
+        archived, version = await self._archive(contact_id, user)
+        if archived is None:
+            return None
+
+        await self.db.commit()
+        await self._publish("deleted", archived.id, version, user)
+        return archived
+
+    async def _archive(self, contact_id: int, user: User):
+        # The birthday digest row goes with the contact (ON DELETE CASCADE).
+        archived = await self.archive.archive_contact(contact_id, user)
+        if archived is None:
+            return None, None
+
+        version = await self._record_tombstone(archived)
+        return archived, version
+
+    async def merge_contacts(
+        self, contact_id: int, duplicate_ids: Sequence[int], user: User
+    ) -> Optional[Contact]:
+        await self._lock_sync_versions(user)
+        duplicate_ids = [i for i in dict.fromkeys(duplicate_ids) if i != contact_id]
+        contacts = {
+            contact.id: contact
+            for contact in await self.get_contacts_by_ids(
+                [contact_id, *duplicate_ids], user
+            )
+        }
+        if len(contacts) != len(duplicate_ids) + 1:
+            return None
+
+        # The kept contact wins; duplicates only fill in what it is missing
+        # and add their tags.
+        contact = contacts[contact_id]
+        tags = list(contact.tags)
+        for duplicate_id in duplicate_ids:
+            duplicate = contacts[duplicate_id]
+            for field in ("birthday", "additional_info"):
+                if getattr(contact, field) is None:
+                    setattr(contact, field, getattr(duplicate, field))
+            tags += [tag for tag in duplicate.tags if tag not in tags]
+        contact.tags = tags
+        await self.db.flush()
+        await self.birthdays.sync_contact(contact)
+        await self.tags.sync_contact(contact)
+
+        archived = [await self._archive(i, user) for i in duplicate_ids]
+        await self.db.commit()
+        await self.db.refresh(contact)
+
+        await self._publish("updated", contact.id, contact.sync_version, user)
+        for duplicate, version in archived:
+            await self._publish("deleted", duplicate.id, version, user)
+        return contact
+
+    async def restore_contact(self, contact_id: int, user: User) -> Optional[Contact]:
+        await self._lock_sync_versions(user)
+        contact = await self.archive.restore_contact(contact_id, user)
         if contact is None:
-            raise ValueError("Contact not found")
+            return None
 
-        await self.db.delete(contact)
+        _apply_derived_fields(contact)
+        await self.db.flush()
+        await self.birthdays.sync_contact(contact)
+        await self.tags.sync_contact(contact)
         await self.db.commit()
+        # Filling in the derived columns was an UPDATE, which drew a new
+        # sync_version on the server.
+        await self.db.refresh(contact)
+        await self._publish("restored", contact.id, contact.sync_version, user)
         return contact
 
+    async def _record_tombstone(self, contact: ContactArchive) -> int:
+        stmt = insert(ContactTombstone).values(
+            contact_id=contact.id, user_id=contact.user_id
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ContactTombstone.contact_id],
+            set_={
+                "user_id": stmt.excluded.user_id,
+                "sync_version": contact_sync_seq.next_value(),
+                "deleted_at": func.now(),
+            },
+        )
+        result = await self.db.execute(stmt.returning(ContactTombstone.sync_version))
+        return result.scalar_one()
+
+    async def get_sync_horizon(self, user: User) -> int:
+        stmt = select(ContactSyncHorizon.purged_through).filter(
+            ContactSyncHorizon.user_id == user.id
+        )
+        return (await self.db.execute(stmt)).scalar_one_or_none() or 0
+
+    async def purge_tombstones(self, older_than: timedelta, batch_size: int) -> int:
+        # One statement per batch deletes the tombstones and moves each user's
+        # sync horizon past them, so a purge never goes unrecorded.
+        batch = (
+            select(ContactTombstone.contact_id)
+            .filter(ContactTombstone.deleted_at < func.now() - older_than)
+            .order_by(ContactTombstone.deleted_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        purged = (
+            delete(ContactTombstone)
+            .filter(ContactTombstone.contact_id.in_(batch.scalar_subquery()))
+            .returning(ContactTombstone.user_id, ContactTombstone.sync_version)
+            .cte("purged")
+        )
+        horizon = insert(ContactSyncHorizon).from_select(
+            ["user_id", "purged_through"],
+            select(purged.c.user_id, func.max(purged.c.sync_version)).group_by(
+                purged.c.user_id
+            ),
+        )
+        horizon = horizon.on_conflict_do_update(
+            index_elements=[ContactSyncHorizon.user_id],
+            set_={
+                "purged_through": func.greatest(
+                    ContactSyncHorizon.purged_through,
+                    horizon.excluded.purged_through,
+                )
+            },
+        ).cte("horizon")
+        stmt = select(func.count()).select_from(purged).add_cte(horizon)
+
+        total = 0
+        while True:
+            deleted = (await self.db.execute(stmt)).scalar_one()
+            await self.db.commit()
+            total += deleted
+            if deleted < batch_size:
+                return total
+
+    async def get_changes(self, since: int, limit: int, user: User):
+        upserted_stmt = (
+            select(Contact)
+            .filter(Contact.user_id == user.id, Contact.sync_version > since)
+            .order_by(Contact.sync_version)
+            .limit(limit + 1)
+        )
+        deleted_stmt = (
+            select(ContactTombstone.contact_id, ContactTombstone.sync_version)
+            .filter(
+                ContactTombstone.user_id == user.id,
+                ContactTombstone.sync_version > since,
+            )
+            .order_by(ContactTombstone.sync_version)
+            .limit(limit + 1)
+        )
+
+        changes = [
+            (contact.sync_version, contact.id, contact)
+            for contact in await self._execute_and_fetch(upserted_stmt)
+        ]
+        changes += [
+            (version, contact_id, None)
+            for contact_id, version in (await self.db.execute(deleted_stmt)).all()
+        ]
+        # Both lists hold their first limit + 1 rows, so the merged head is
+        # exactly the first `limit` changes overall.
+        changes.sort(key=lambda change: change[0])
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+
+        # A contact deleted and restored within the window only reports its
+        # latest state.
+        latest = {contact_id: contact for _, contact_id, contact in changes}
+        return {
+            "token": changes[-1][0] if changes else since,
+            "has_more": has_more,
+            "upserted": [contact for contact in latest.values() if contact],
+            "deleted": [
+                contact_id for contact_id, contact in latest.items() if not contact
+            ],
+        }
+
     async def search_contacts(self, query: str, user: User) -> Sequence[Contact]:
         stmt = select(Contact).filter(
             and_(
@@ -143,32 +408,70 @@ class ContactRepository:
         result = await self.db.execute(stmt)
         return result.scalars().all()
 
-    async def get_upcoming_birthdays(
-        self, days: int, skip: int, limit: int, user: User
-    ):
-        today = date.today()
-        future_date = today + timedelta(days=days)
-        conditions = _birthday_filter_conditions(today, future_date)
+    async def suggest_contacts(
+        self, query: str, limit: int, user: User
+    ) -> Sequence[Contact]:
+        terms = query.lower().split()
+        if not terms:
+            return []
+
+        # Must match the ix_contacts_user_id_lower_* index expressions.
+        first = func.lower(Contact.first_name)
+        last = func.lower(Contact.last_name)
+        email = func.lower(Contact.email)
+
+        if len(terms) == 1:
+            term = terms[0]
+            branches = [
+                (_starts_with(first, term), first),
+                (_starts_with(last, term), last),
+                (_starts_with(email, term), email),
+            ]
+            rank = case(
+                (or_(first == term, last == term), 0),
+                (_starts_with(first, term), 1),
+                (_starts_with(last, term), 2),
+                else_=3,
+            )
+        else:
+            given, family = terms[0], " ".join(terms[1:])
+            branches = [
+                (and_(_starts_with(first, given), _starts_with(last, family)), first),
+                (and_(_starts_with(first, family), _starts_with(last, given)), last),
+            ]
+            rank = case((branches[0][0], 0), else_=1)
 
+        # Each branch is a bounded range scan on one prefix index, so a short
+        # prefix matching thousands of contacts still reads at most `limit`
+        # rows per branch before ranking. Ordered by the indexed expression,
+        # every branch keeps its exact and shortest matches rather than an
+        # arbitrary subset.
+        candidates = union_all(
+            *(
+                select(Contact.id)
+                .filter(Contact.user_id == user.id, branch)
+                .order_by(_pattern_order(indexed))
+                .limit(limit)
+                for branch, indexed in branches
+            )
+        ).subquery()
         stmt = (
             select(Contact)
-            .filter(Contact.user_id == user.id, conditions)
-            .offset(skip)
+            .filter(Contact.user_id == user.id, Contact.id.in_(select(candidates.c.id)))
+            .order_by(rank, last, first, Contact.id)
             .limit(limit)
         )
+        return await self._execute_and_fetch(stmt)
 
-        total_count_stmt = (
-            select(func.count())
-            .select_from(Contact)
-            .filter(Contact.user_id == user.id, conditions)
+    async def get_upcoming_birthdays(
+        self,
+        days: int,
+        skip: int,
+        limit: int,
+        user: User,
+        tags: Optional[Sequence[str]] = None,
+        any_tags: Optional[Sequence[str]] = None,
+    ):
+        return await self.birthdays.get_upcoming(
+            days, skip, limit, user, filters=tag_filters(tags, any_tags)
         )
-
-        total_count = await self._execute_and_count(total_count_stmt)
-        contacts = await self._execute_and_fetch(stmt)
-
-        return {
-            "total_count": total_count,
-            "skip": skip,
-            "limit": limit,
-            "contacts": contacts,
-        }
@@ -0,0 +1,78 @@
+from sqlalchemy import String, and_, func, literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from src.database.models import Contact, User
+from src.tracing import traced
+
+# Blocking key column -> reason reported for pairs that share it.
+BLOCKING_KEYS = {
+    "email_key": "email",
+    "phone_e164": "phone",
+    "name_key": "name",
+}
+
+
+@traced("repository")
+class DuplicateRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _candidate_pairs(self, user: User):
+        # One self-join per blocking key, each answered from its
+        # (user_id, key) index. A pair appears once per key it shares.
+        left = aliased(Contact)
+        right = aliased(Contact)
+        joins = []
+        for column, reason in BLOCKING_KEYS.items():
+            left_key, right_key = getattr(left, column), getattr(right, column)
+            joins.append(
+                select(
+                    left.id.label("left_id"),
+                    right.id.label("right_id"),
+                    literal(reason, String).label("reason"),
+                )
+                .join(
+                    right,
+                    and_(
+                        right.user_id == user.id,
+                        right_key == left_key,
+                        right.id > left.id,
+                    ),
+                )
+                .filter(left.user_id == user.id, left_key.is_not(None))
+            )
+        candidates = union_all(*joins).subquery()
+        return (
+            select(
+                candidates.c.left_id,
+                candidates.c.right_id,
+                func.array_agg(candidates.c.reason).label("reasons"),
+            )
+            .group_by(candidates.c.left_id, candidates.c.right_id)
+            .subquery()
+        )
+
+    async def get_candidate_pairs(self, skip: int, limit: int, user: User):
+        pairs = self._candidate_pairs(user)
+        stmt = (
+            select(pairs.c.left_id, pairs.c.right_id, pairs.c.reasons)
+            .order_by(
+                func.cardinality(pairs.c.reasons).desc(),
+                pairs.c.left_id,
+                pairs.c.right_id,
+            )
+            .offset(skip)
+            .limit(limit)
+        )
+        total_count_stmt = select(func.count()).select_from(pairs)
+
+        total_count = (await self.db.execute(total_count_stmt)).scalar()
+        rows = (await self.db.execute(stmt)).all()
+
+        return {
+            "total_count": total_count,
+            "skip": skip,
+            "limit": limit,
+            "pairs": rows,
+        }
@@ -0,0 +1,52 @@
+from typing import Optional, Sequence
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.models import Contact, ContactTag, User
+from src.tracing import traced
+
+
+def tag_filters(
+    tags: Optional[Sequence[str]] = None, any_tags: Optional[Sequence[str]] = None
+) -> list:
+    # @> and && on the array are both served, together with the user_id filter,
+    # by the GIN index on contacts (user_id, tags).
+    filters = []
+    if tags:
+        filters.append(Contact.tags.contains(list(tags)))
+    if any_tags:
+        filters.append(Contact.tags.overlap(list(any_tags)))
+    return filters
+
+
+@traced("repository")
+class ContactTagRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def sync_contact(self, contact: Contact):
+        await self.db.execute(
+            delete(ContactTag).filter_by(user_id=contact.user_id, contact_id=contact.id)
+        )
+        if contact.tags:
+            await self.db.execute(
+                insert(ContactTag).on_conflict_do_nothing(),
+                [
+                    {"user_id": contact.user_id, "tag": tag, "contact_id": contact.id}
+                    for tag in contact.tags
+                ],
+            )
+
+    async def get_counts(self, user: User):
+        stmt = (
+            select(ContactTag.tag, func.count().label("count"))
+            .filter(ContactTag.user_id == user.id)
+            .group_by(ContactTag.tag)
+            .order_by(ContactTag.tag)
+        )
+        return [
+            {"tag": tag, "count": count}
+            for tag, count in (await self.db.execute(stmt)).all()
+        ]
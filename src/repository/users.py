@@ -3,8 +3,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.models import User
 from src.schemas import UserCreate
+from src.tracing import traced
 
 
+@traced("repository")
 class UserRepository:
     def __init__(self, session: AsyncSession):
         self.db = session
@@ -1,7 +1,13 @@
-from datetime import date
-from typing import Optional, List
+from datetime import date, datetime
+from typing import Dict, Optional, List
 
-from pydantic import BaseModel, EmailStr, ConfigDict
+from pydantic import BaseModel, EmailStr, ConfigDict, Field, field_validator
+
+MAX_MULTI_GET_IDS = 500
+MAX_PHONE_LOOKUPS = 500
+MAX_MERGE_IDS = 50
+MAX_TAGS_PER_CONTACT = 20
+MAX_TAG_LENGTH = 50
 
 
 class ContactBase(BaseModel):
@@ -11,6 +17,15 @@ class ContactBase(BaseModel):
     phone_number: str
     birthday: Optional[date] = None
     additional_info: Optional[str] = None
+    tags: List[str] = Field(default_factory=list, max_length=MAX_TAGS_PER_CONTACT)
+
+    @field_validator("tags")
+    @classmethod
+    def normalize_tags(cls, tags: List[str]) -> List[str]:
+        tags = [tag.strip().lower() for tag in tags]
+        if any(not tag or len(tag) > MAX_TAG_LENGTH for tag in tags):
+            raise ValueError(f"Tags must be 1 to {MAX_TAG_LENGTH} characters long")
+        return list(dict.fromkeys(tags))
 
 
 class ContactCreate(ContactBase):
@@ -32,6 +47,63 @@ class ContactListResponse(BaseModel):
     contacts: List[ContactResponse]
 
 
+class ArchivedContactResponse(ContactResponse):
+    deleted_at: datetime
+
+
+class ArchivedContactListResponse(BaseModel):
+    total_count: int
+    skip: int
+    limit: int
+    contacts: List[ArchivedContactResponse]
+
+
+class ContactTagCount(BaseModel):
+    tag: str
+    count: int
+
+
+class ContactChangesResponse(BaseModel):
+    token: int
+    has_more: bool
+    upserted: List[ContactResponse]
+    deleted: List[int]
+
+
+class ContactMultiGetRequest(BaseModel):
+    ids: List[int] = Field(min_length=1, max_length=MAX_MULTI_GET_IDS)
+
+
+class ContactMultiGetResponse(BaseModel):
+    contacts: Dict[int, ContactResponse]
+    missing: List[int]
+
+
+class ContactPhoneLookupRequest(BaseModel):
+    phones: List[str] = Field(min_length=1, max_length=MAX_PHONE_LOOKUPS)
+
+
+class ContactPhoneLookupResponse(BaseModel):
+    matches: Dict[str, List[ContactResponse]]
+    unmatched: List[str]
+
+
+class ContactDuplicatePair(BaseModel):
+    contacts: List[ContactResponse]
+    reasons: List[str]
+
+
+class ContactDuplicatesResponse(BaseModel):
+    total_count: int
+    skip: int
+    limit: int
+    pairs: List[ContactDuplicatePair]
+
+
+class ContactMergeRequest(BaseModel):
+    duplicate_ids: List[int] = Field(min_length=1, max_length=MAX_MERGE_IDS)
+
+
 class User(BaseModel):
     id: int
     username: str
@@ -0,0 +1,218 @@
+import argparse
+import logging
+import multiprocessing
+import os
+import random
+import signal
+import time
+from importlib.util import find_spec
+
+import uvicorn
+
+from src.conf.config import config as app_config
+
+logger = logging.getLogger("src.server")
+
+APP = "main:app"
+
+
+def available_cpus() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def fastest_loop() -> str:
+    return "uvloop" if find_spec("uvloop") else "asyncio"
+
+
+def fastest_http() -> str:
+    return "httptools" if find_spec("httptools") else "h11"
+
+
+def build_config(args: argparse.Namespace) -> uvicorn.Config:
+    return uvicorn.Config(
+        APP,
+        host=args.host,
+        port=args.port,
+        loop=fastest_loop(),
+        http=fastest_http(),
+        lifespan="on",
+        proxy_headers=True,
+        timeout_graceful_shutdown=int(app_config.SHUTDOWN_DRAIN_TIMEOUT),
+        log_level="info",
+    )
+
+
+class Server(uvicorn.Server):
+    async def shutdown(self, sockets=None) -> None:
+        # Recycling (max requests, memory) stops a worker without a signal.
+        # End the change streams before uvicorn waits for connections to close.
+        from src.events import contact_events
+
+        contact_events.close_subscriptions()
+        await super().shutdown(sockets)
+
+
+def run_worker(config: uvicorn.Config, sockets: list, index: int, args) -> None:
+    from src.worker import current_rss_mb, worker_state
+
+    max_requests = None
+    if args.max_requests > 0:
+        max_requests = args.max_requests + random.randint(
+            0, max(args.max_requests_jitter, 0)
+        )
+
+    config.limit_max_requests = max_requests
+    worker_state.index = index
+    worker_state.workers = args.workers
+    worker_state.loop = config.loop
+    worker_state.http = config.http
+    worker_state.max_requests = max_requests
+    worker_state.max_memory_mb = args.max_memory_mb or None
+    worker_state.started_at = time.time()
+
+    server = Server(config)
+
+    async def check_memory():
+        rss_mb = current_rss_mb()
+        if args.max_memory_mb and rss_mb > args.max_memory_mb:
+            logger.warning(
+                "Worker %d (pid %d) uses %.0f MB > %d MB, recycling",
+                index,
+                os.getpid(),
+                rss_mb,
+                args.max_memory_mb,
+            )
+            server.should_exit = True
+
+    # uvicorn calls callback_notify from its main loop every timeout_notify
+    # seconds, which is all the memory watchdog needs.
+    config.callback_notify = check_memory
+    config.timeout_notify = args.memory_check_interval
+    server.run(sockets=sockets)
+
+
+class Supervisor:
+    def __init__(self, config: uvicorn.Config, args: argparse.Namespace):
+        self.config = config
+        self.args = args
+        self.context = multiprocessing.get_context("fork")
+        self.workers: dict[int, multiprocessing.Process] = {}
+        self.should_exit = False
+
+    def spawn(self, index: int, sockets: list) -> None:
+        process = self.context.Process(
+            target=run_worker,
+            args=(self.config, sockets, index, self.args),
+            name=f"contacts-worker-{index}",
+        )
+        process.start()
+        self.workers[index] = process
+        logger.info("Started worker %d (pid %d)", index, process.pid)
+
+    def handle_exit(self, signum, frame) -> None:
+        self.should_exit = True
+
+    def run(self) -> None:
+        if self.args.preload:
+            # Import the app once in the supervisor; forked workers share the
+            # already imported modules copy-on-write.
+            self.config.load()
+
+        sockets = [self.config.bind_socket()]
+        signal.signal(signal.SIGINT, self.handle_exit)
+        signal.signal(signal.SIGTERM, self.handle_exit)
+
+        logger.info(
+            "Serving %s on %s:%d with %d workers (loop=%s, http=%s, preload=%s)",
+            APP,
+            self.config.host,
+            self.config.port,
+            self.args.workers,
+            self.config.loop,
+            self.config.http,
+            self.args.preload,
+        )
+        for index in range(self.args.workers):
+            self.spawn(index, sockets)
+
+        while not self.should_exit:
+            time.sleep(0.5)
+            for index, process in list(self.workers.items()):
+                if process.is_alive() or self.should_exit:
+                    continue
+                logger.info(
+                    "Worker %d (pid %d) exited with %s, replacing",
+                    index,
+                    process.pid,
+                    process.exitcode,
+                )
+                process.join()
+                self.spawn(index, sockets)
+
+        self.shutdown()
+        for sock in sockets:
+            sock.close()
+
+    def shutdown(self) -> None:
+        for process in self.workers.values():
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + app_config.SHUTDOWN_DRAIN_TIMEOUT + 5
+        for process in self.workers.values():
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                logger.warning(
+                    "Worker pid %d did not stop in time, killing", process.pid
+                )
+                process.kill()
+                process.join()
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the API with multiple workers.")
+    parser.add_argument("--host", default=app_config.WEB_HOST)
+    parser.add_argument("--port", type=int, default=app_config.WEB_PORT)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=app_config.WEB_WORKERS or available_cpus(),
+        help="worker processes (defaults to the number of usable CPUs)",
+    )
+    parser.add_argument(
+        "--preload",
+        action=argparse.BooleanOptionalAction,
+        default=app_config.WEB_PRELOAD,
+        help="import the app in the supervisor before forking workers",
+    )
+    parser.add_argument(
+        "--max-requests", type=int, default=app_config.WORKER_MAX_REQUESTS
+    )
+    parser.add_argument(
+        "--max-requests-jitter",
+        type=int,
+        default=app_config.WORKER_MAX_REQUESTS_JITTER,
+    )
+    parser.add_argument(
+        "--max-memory-mb", type=int, default=app_config.WORKER_MAX_MEMORY_MB
+    )
+    parser.add_argument(
+        "--memory-check-interval",
+        type=float,
+        default=app_config.WORKER_MEMORY_CHECK_INTERVAL,
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    logging.basicConfig(
+        level=logging.INFO, format="%(levelname)s [%(name)s] %(message)s"
+    )
+    args = parse_args(argv)
+    args.workers = max(args.workers, 1)
+    Supervisor(build_config(args), args).run()
+
+
+if __name__ == "__main__":
+    main()
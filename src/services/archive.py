@@ -0,0 +1,27 @@
+import logging
+from datetime import timedelta
+
+from src.conf.config import config as app_config
+from src.database.db import sessionmanager
+from src.repository.archive import ContactArchiveRepository
+from src.repository.contacts import ContactRepository
+
+logger = logging.getLogger(__name__)
+
+
+async def purge_contact_archive():
+    async with sessionmanager.session() as session:
+        purged = await ContactArchiveRepository(session).purge_expired(
+            timedelta(days=app_config.ARCHIVE_RETENTION_DAYS),
+            app_config.ARCHIVE_PURGE_BATCH_SIZE,
+        )
+    logger.info("Purged %d archived contacts past retention", purged)
+
+
+async def purge_contact_tombstones():
+    async with sessionmanager.session() as session:
+        purged = await ContactRepository(session).purge_tombstones(
+            timedelta(days=app_config.TOMBSTONE_RETENTION_DAYS),
+            app_config.TOMBSTONE_PURGE_BATCH_SIZE,
+        )
+    logger.info("Purged %d contact tombstones past retention", purged)
@@ -1,19 +1,29 @@
 from datetime import datetime, timedelta, UTC
+from functools import lru_cache
 from typing import Optional
 
 from fastapi import Depends, HTTPException, status
-from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
-from jose import JWTError, jwt
 
 from src.database.db import get_db
 from src.conf.config import config as app_config
 from src.services.users import UserService
 
 
+@lru_cache
+def get_pwd_context():
+    # passlib resolves the bcrypt backend on construction; defer it to the
+    # first login/registration instead of paying for it at import time.
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
 class Hash:
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    @property
+    def pwd_context(self):
+        return get_pwd_context()
 
     def verify_password(self, plain_password, hashed_password):
         return self.pwd_context.verify(plain_password, hashed_password)
@@ -26,6 +36,8 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
 async def create_access_token(data: dict, expires_delta: Optional[int] = None):
+    from jose import jwt
+
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.now(UTC) + timedelta(seconds=expires_delta)
@@ -43,6 +55,8 @@ async def create_access_token(data: dict, expires_delta: Optional[int] = None):
 async def get_current_user(
     token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
 ):
+    from jose import JWTError, jwt
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -68,6 +82,8 @@ async def get_current_user(
 
 
 def create_email_token(data: dict):
+    from jose import jwt
+
     to_encode = data.copy()
     expire = datetime.now(UTC) + timedelta(days=1)
     to_encode.update({"iat": datetime.now(UTC), "exp": expire})
@@ -78,6 +94,8 @@ def create_email_token(data: dict):
 
 
 async def get_email_from_token(token: str):
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(
             token, app_config.JWT_SECRET, algorithms=[app_config.JWT_ALGORITHM]
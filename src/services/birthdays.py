@@ -0,0 +1,16 @@
+import logging
+from datetime import date
+
+from src.conf.config import config as app_config
+from src.database.db import sessionmanager
+from src.repository.birthdays import BirthdayDigestRepository
+
+logger = logging.getLogger(__name__)
+
+
+async def refresh_birthday_digest():
+    async with sessionmanager.session() as session:
+        refreshed = await BirthdayDigestRepository(session).refresh(
+            date.today(), app_config.BIRTHDAY_DIGEST_BATCH_SIZE
+        )
+    logger.info("Birthday digest refreshed for %d contacts", refreshed)
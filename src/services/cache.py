@@ -0,0 +1,228 @@
+import json
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Awaitable, Callable
+
+from src.conf.config import config as app_config
+from src.events import ContactEvent, contact_events
+from src.services.singleflight import SingleFlight
+
+MISSING = object()
+
+
+class LRUCache:
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISSING
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class InMemorySharedCache:
+    # Same async interface as the Redis tier, for tests and single-host setups.
+    def __init__(self):
+        self._values: dict[str, tuple[float | None, str]] = {}
+
+    async def get(self, key: str) -> str | None:
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at < time.monotonic():
+            del self._values[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: str, ttl: float | None = None):
+        expires_at = time.monotonic() + ttl if ttl else None
+        self._values[key] = (expires_at, value)
+
+    async def incr(self, key: str) -> int:
+        value = int(await self.get(key) or 0) + 1
+        self._values[key] = (None, str(value))
+        return value
+
+
+class RedisSharedCache:
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError(
+                "CACHE_REDIS_URL is set but the 'redis' package is not installed"
+            ) from e
+        self._client = redis.from_url(url, decode_responses=True)
+
+    async def get(self, key: str) -> str | None:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: str, ttl: float | None = None):
+        await self._client.set(key, value, ex=int(ttl) if ttl else None)
+
+    async def incr(self, key: str) -> int:
+        return await self._client.incr(key)
+
+
+# Keys embed a per-user version. Writes bump the version instead of deleting
+# keys, so every entry cached before the write becomes unreachable at once,
+# including ones being loaded concurrently with the write.
+class ContactCache:
+    def __init__(
+        self,
+        local: LRUCache,
+        shared=None,
+        ttl: float = 60.0,
+        enabled: bool = True,
+    ):
+        self.local = local
+        self.shared = shared
+        self.ttl = ttl
+        self.enabled = enabled
+        self.local_enabled = True
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.loads = SingleFlight()
+        self._versions: dict[int, int] = defaultdict(int)
+        # Bumped when contact events may have been lost; retires every local
+        # version at once.
+        self._generation = 0
+
+    async def _version(self, user_id: int) -> int | str:
+        if self.shared is None:
+            return f"{self._generation}.{self._versions[user_id]}"
+        return int(await self.shared.get(f"contacts:version:{user_id}") or 0)
+
+    async def get_or_load(
+        self, user_id: int, key_parts: tuple, loader: Callable[[], Awaitable[Any]]
+    ):
+        if self.enabled:
+            version = await self._version(user_id)
+        else:
+            version = self._versions[user_id]
+        # The version is part of the key, so a read that starts after a write
+        # never joins a load that began before it.
+        key = f"contacts:{user_id}:v{version}:" + json.dumps(key_parts, default=str)
+        if not self.enabled:
+            return await self.loads.do(key, loader)
+
+        value = self._get_local(key)
+        if value is not MISSING:
+            self.local_hits += 1
+            return value
+
+        # Concurrent misses for the same key share one load instead of all
+        # hitting the database.
+        return await self.loads.do(key, lambda: self._load(key, loader))
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Any]]):
+        if self.shared is not None:
+            raw = await self.shared.get(key)
+            if raw is not None:
+                self.shared_hits += 1
+                value = json.loads(raw)
+                self._set_local(key, value)
+                return value
+
+        self.misses += 1
+        value = await loader()
+        self._set_local(key, value)
+        if self.shared is not None:
+            await self.shared.set(key, json.dumps(value), self.ttl)
+        return value
+
+    def _get_local(self, key: str):
+        return self.local.get(key) if self.local_enabled else MISSING
+
+    def _set_local(self, key: str, value):
+        if self.local_enabled:
+            self.local.set(key, value)
+
+    def check_coherence(self, workers: int, events_backend: str) -> bool:
+        """Switch off the per-process tiers where they would serve stale reads.
+
+        A worker learns about writes handled by other workers only through
+        the Redis version key or Postgres-backed contact events. With several
+        workers and neither, its LRU would keep answering with pre-write data
+        until the TTL runs out.
+        """
+        if workers > 1 and isinstance(self.shared, InMemorySharedCache):
+            # memory:// lives in one process, versions included.
+            self.shared = None
+        self.local_enabled = (
+            workers <= 1
+            or isinstance(self.shared, RedisSharedCache)
+            or events_backend == "postgres"
+        )
+        return self.local_enabled
+
+    async def invalidate_user(self, user_id: int):
+        self.invalidations += 1
+        self._versions[user_id] += 1
+        if self.shared is not None:
+            await self.shared.incr(f"contacts:version:{user_id}")
+
+    def on_contact_event(self, event: ContactEvent):
+        # Without a shared tier, versions are per process; events fanned out by
+        # the Postgres backend carry writes made on other workers.
+        self._versions[event.user_id] += 1
+
+    def on_events_resync(self):
+        # The versions missed an unknown set of writes made on other workers.
+        self._generation += 1
+        self.local = LRUCache(self.local.max_entries, self.local.ttl)
+
+    def stats(self) -> dict:
+        lookups = self.local_hits + self.shared_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "local_tier": self.local_enabled,
+            "shared_tier": type(self.shared).__name__ if self.shared else None,
+            "local_entries": len(self.local),
+            "local_hits": self.local_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_ratio": (
+                round((lookups - self.misses) / lookups, 4) if lookups else 0.0
+            ),
+        }
+
+
+def create_shared_cache(url: str | None):
+    if not url:
+        return None
+    if url == "memory://":
+        return InMemorySharedCache()
+    return RedisSharedCache(url)
+
+
+contact_cache = ContactCache(
+    LRUCache(app_config.CACHE_LOCAL_MAX_ENTRIES, app_config.CACHE_TTL_SECONDS),
+    create_shared_cache(app_config.CACHE_REDIS_URL),
+    ttl=app_config.CACHE_TTL_SECONDS,
+    enabled=app_config.CACHE_ENABLED,
+)
+contact_events.add_listener(
+    contact_cache.on_contact_event, on_resync=contact_cache.on_events_resync
+)
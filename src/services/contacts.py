@@ -1,3 +1,4 @@
+from datetime import date
 from typing import Optional
 
 from fastapi import HTTPException, status
@@ -7,7 +8,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.models import User
 from src.repository.contacts import ContactRepository
-from src.schemas import ContactCreate, ContactUpdate
+from src.schemas import ContactCreate, ContactUpdate, ContactResponse
+from src.services.cache import contact_cache
+from src.services.phones import normalize_phone
+from src.tracing import traced
 
 
 def _handle_integrity_error(e: IntegrityError):
@@ -23,13 +27,36 @@ def _handle_integrity_error(e: IntegrityError):
         )
 
 
+def _serialize_contact(contact):
+    if contact is None:
+        return None
+    return ContactResponse.model_validate(contact, from_attributes=True).model_dump(
+        mode="json"
+    )
+
+
+def _serialize_page(page: dict):
+    return {**page, "contacts": [_serialize_contact(c) for c in page["contacts"]]}
+
+
+def _normalize_tags(tags: Optional[list[str]]) -> Optional[tuple[str, ...]]:
+    # Same normalization as stored tags; sorted so equivalent filters share a
+    # cache key.
+    if not tags:
+        return None
+    return tuple(sorted({tag.strip().lower() for tag in tags if tag.strip()})) or None
+
+
+@traced("service")
 class ContactService:
     def __init__(self, db: AsyncSession):
         self.repo = ContactRepository(db)
 
     async def create_contact(self, contact_data: ContactCreate, user: User):
         try:
-            return await self.repo.create_contact(contact_data, user)
+            contact = await self.repo.create_contact(contact_data, user)
+            await contact_cache.invalidate_user(user.id)
+            return contact
         except IntegrityError as e:
             await self.repo.db.rollback()
             _handle_integrity_error(e)
@@ -42,34 +69,179 @@ class ContactService:
         last_name: Optional[str],
         email: Optional[str],
         user: User,
+        tags: Optional[list[str]] = None,
+        any_tags: Optional[list[str]] = None,
     ):
-        return await self.repo.get_contacts(
-            skip, limit, first_name, last_name, email, user
-        )
+        tags, any_tags = _normalize_tags(tags), _normalize_tags(any_tags)
+
+        async def load():
+            return _serialize_page(
+                await self.repo.get_contacts(
+                    skip, limit, first_name, last_name, email, user, tags, any_tags
+                )
+            )
+
+        key = ("list", skip, limit, first_name, last_name, email, tags, any_tags)
+        return await contact_cache.get_or_load(user.id, key, load)
 
     async def get_contact_by_id(self, contact_id: int, user: User):
-        return await self.repo.get_contact_by_id(contact_id, user)
+        async def load():
+            return _serialize_contact(
+                await self.repo.get_contact_by_id(contact_id, user)
+            )
+
+        key = ("contact", contact_id)
+        return await contact_cache.get_or_load(user.id, key, load)
+
+    async def get_contacts_by_ids(self, contact_ids: list[int], user: User):
+        contact_ids = list(dict.fromkeys(contact_ids))
+        found = {
+            contact.id: contact
+            for contact in await self.repo.get_contacts_by_ids(contact_ids, user)
+        }
+        return {
+            "contacts": found,
+            "missing": [
+                contact_id for contact_id in contact_ids if contact_id not in found
+            ],
+        }
+
+    async def lookup_phone(self, phone: str, user: User):
+        phone_e164 = normalize_phone(phone)
+        if phone_e164 is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid phone number",
+            )
+        return await self.repo.get_contacts_by_phones([phone_e164], user)
+
+    async def lookup_phones(self, phones: list[str], user: User):
+        # Callers send numbers as they appear in their call log; answer keyed
+        # by the original strings.
+        normalized = {phone: normalize_phone(phone) for phone in dict.fromkeys(phones)}
+        by_phone: dict[str, list] = {}
+        wanted = [phone for phone in set(normalized.values()) if phone]
+        if wanted:
+            for contact in await self.repo.get_contacts_by_phones(wanted, user):
+                by_phone.setdefault(contact.phone_e164, []).append(contact)
+
+        matches = {
+            phone: by_phone[phone_e164]
+            for phone, phone_e164 in normalized.items()
+            if phone_e164 in by_phone
+        }
+        return {
+            "matches": matches,
+            "unmatched": [phone for phone in normalized if phone not in matches],
+        }
+
+    async def get_changes(self, since: int, limit: int, user: User):
+        # Tombstones past retention are gone; a token from before the purge
+        # could silently miss deletes.
+        if since and since < await self.repo.get_sync_horizon(user):
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="Sync token expired; start a full resync with since=0",
+            )
+        return await self.repo.get_changes(since, limit, user)
 
     async def get_upcoming_birthdays(
-        self, days: int, skip: int, limit: int, user: User
+        self,
+        days: int,
+        skip: int,
+        limit: int,
+        user: User,
+        tags: Optional[list[str]] = None,
+        any_tags: Optional[list[str]] = None,
     ):
-        return await self.repo.get_upcoming_birthdays(days, skip, limit, user)
+        tags, any_tags = _normalize_tags(tags), _normalize_tags(any_tags)
+
+        async def load():
+            return _serialize_page(
+                await self.repo.get_upcoming_birthdays(
+                    days, skip, limit, user, tags, any_tags
+                )
+            )
+
+        # The window moves with the calendar, so the day is part of the key.
+        key = ("birthdays", date.today().isoformat(), days, skip, limit, tags, any_tags)
+        return await contact_cache.get_or_load(user.id, key, load)
+
+    async def get_tag_counts(self, user: User):
+        return await self.repo.tags.get_counts(user)
 
     async def update_contact(
         self, contact_id: int, contact_data: ContactUpdate, user: User
     ):
         try:
-            return await self.repo.update_contact(contact_id, contact_data, user)
+            contact = await self.repo.update_contact(contact_id, contact_data, user)
+            await contact_cache.invalidate_user(user.id)
+            return contact
         except IntegrityError as e:
             await self.repo.db.rollback()
             _handle_integrity_error(e)
 
     async def delete_contact(self, contact_id: int, user: User):
         try:
-            return await self.repo.delete_contact(contact_id, user)
+            contact = await self.repo.delete_contact(contact_id, user)
+            await contact_cache.invalidate_user(user.id)
+            return contact
+        except IntegrityError as e:
+            await self.repo.db.rollback()
+            _handle_integrity_error(e)
+
+    async def get_archived_contacts(self, skip: int, limit: int, user: User):
+        return await self.repo.archive.get_archived(skip, limit, user)
+
+    async def restore_contact(self, contact_id: int, user: User):
+        try:
+            contact = await self.repo.restore_contact(contact_id, user)
+            await contact_cache.invalidate_user(user.id)
+            return contact
+        except IntegrityError as e:
+            await self.repo.db.rollback()
+            _handle_integrity_error(e)
+
+    async def purge_contact(self, contact_id: int, user: User):
+        return await self.repo.archive.purge_contact(contact_id, user)
+
+    async def get_duplicates(self, skip: int, limit: int, user: User):
+        page = await self.repo.duplicates.get_candidate_pairs(skip, limit, user)
+        contact_ids = {i for left, right, _ in page["pairs"] for i in (left, right)}
+        contacts = {
+            contact.id: contact
+            for contact in (
+                await self.repo.get_contacts_by_ids(list(contact_ids), user)
+                if contact_ids
+                else []
+            )
+        }
+        # A contact deleted or merged between the two queries drops its pairs.
+        return {
+            **page,
+            "pairs": [
+                {
+                    "contacts": [contacts[left], contacts[right]],
+                    "reasons": sorted(reasons),
+                }
+                for left, right, reasons in page["pairs"]
+                if left in contacts and right in contacts
+            ],
+        }
+
+    async def merge_contacts(
+        self, contact_id: int, duplicate_ids: list[int], user: User
+    ):
+        try:
+            contact = await self.repo.merge_contacts(contact_id, duplicate_ids, user)
+            await contact_cache.invalidate_user(user.id)
+            return contact
         except IntegrityError as e:
             await self.repo.db.rollback()
             _handle_integrity_error(e)
 
     async def search_contacts(self, query: str, user: User):
         return await self.repo.search_contacts(query, user)
+
+    async def suggest_contacts(self, query: str, limit: int, user: User):
+        return await self.repo.suggest_contacts(query, limit, user)
@@ -0,0 +1,57 @@
+from typing import Optional
+
+# Blocking keys: cheap normalized values that near-duplicate contacts share.
+# Contacts are only compared when a key matches, so candidate pairs come from
+# index joins instead of comparing every pair.
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+
+def soundex(word: str) -> str:
+    """American Soundex code ("Robert" -> "R163"), or "" without latin letters."""
+    letters = [c for c in word.lower() if "a" <= c <= "z"]
+    if not letters:
+        return ""
+
+    code = letters[0].upper()
+    previous = _SOUNDEX_CODES.get(letters[0], "")
+    for letter in letters[1:]:
+        digit = _SOUNDEX_CODES.get(letter, "")
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        # h and w do not separate letters with the same code; vowels do.
+        if letter not in "hw":
+            previous = digit
+    return code.ljust(4, "0")
+
+
+def _phonetic(word: str) -> str:
+    # Names without latin letters (e.g. Cyrillic) fall back to their
+    # case-folded letters.
+    return soundex(word) or "".join(c for c in word.casefold() if c.isalpha())
+
+
+def name_key(first_name: Optional[str], last_name: Optional[str]) -> Optional[str]:
+    # Sorted, so "Ivan Petrenko" and "Petrenko Ivan" share a key.
+    parts = sorted(
+        key for key in (_phonetic(first_name or ""), _phonetic(last_name or "")) if key
+    )
+    return " ".join(parts) or None
+
+
+def email_key(email: Optional[str]) -> Optional[str]:
+    # Local part without case, "+tag" suffix or dots: "J.Doe+work@x.com" and
+    # "jdoe@y.com" share a key.
+    if not email:
+        return None
+    local = email.rsplit("@", 1)[0].lower().split("+", 1)[0].replace(".", "")
+    return local or None
@@ -1,28 +1,40 @@
+import logging
+from functools import lru_cache
 from pathlib import Path
 
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
-from fastapi_mail.errors import ConnectionErrors
 from pydantic import EmailStr
 
 from src.services.auth import create_email_token
 from src.conf.config import config as app_config
 
-conf = ConnectionConfig(
-    MAIL_USERNAME=app_config.MAIL_USERNAME,
-    MAIL_PASSWORD=app_config.MAIL_PASSWORD,
-    MAIL_FROM=app_config.MAIL_FROM,
-    MAIL_PORT=app_config.MAIL_PORT,
-    MAIL_SERVER=app_config.MAIL_SERVER,
-    MAIL_FROM_NAME=app_config.MAIL_FROM_NAME,
-    MAIL_STARTTLS=app_config.MAIL_STARTTLS,
-    MAIL_SSL_TLS=app_config.MAIL_SSL_TLS,
-    USE_CREDENTIALS=app_config.USE_CREDENTIALS,
-    VALIDATE_CERTS=app_config.VALIDATE_CERTS,
-    TEMPLATE_FOLDER=Path(__file__).parent / "templates",
-)
+logger = logging.getLogger(__name__)
+
+
+@lru_cache
+def get_mail_connection_config():
+    # fastapi_mail pulls in aiosmtplib, jinja2 and friends, so it is imported on
+    # the first send instead of at worker boot.
+    from fastapi_mail import ConnectionConfig
+
+    return ConnectionConfig(
+        MAIL_USERNAME=app_config.MAIL_USERNAME,
+        MAIL_PASSWORD=app_config.MAIL_PASSWORD,
+        MAIL_FROM=app_config.MAIL_FROM,
+        MAIL_PORT=app_config.MAIL_PORT,
+        MAIL_SERVER=app_config.MAIL_SERVER,
+        MAIL_FROM_NAME=app_config.MAIL_FROM_NAME,
+        MAIL_STARTTLS=app_config.MAIL_STARTTLS,
+        MAIL_SSL_TLS=app_config.MAIL_SSL_TLS,
+        USE_CREDENTIALS=app_config.USE_CREDENTIALS,
+        VALIDATE_CERTS=app_config.VALIDATE_CERTS,
+        TEMPLATE_FOLDER=Path(__file__).parent / "templates",
+    )
 
 
 async def send_email(email: EmailStr, username: str, host: str):
+    from fastapi_mail import FastMail, MessageSchema, MessageType
+    from fastapi_mail.errors import ConnectionErrors
+
     try:
         token_verification = create_email_token({"sub": email})
         message = MessageSchema(
@@ -36,7 +48,7 @@ async def send_email(email: EmailStr, username: str, host: str):
             subtype=MessageType.html,
         )
 
-        fm = FastMail(conf)
+        fm = FastMail(get_mail_connection_config())
         await fm.send_message(message, template_name="verify_email.html")
     except ConnectionErrors as err:
-        print(err)
+        logger.error("Verification email to %s failed: %s", email, err)
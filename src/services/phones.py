@@ -0,0 +1,45 @@
+import re
+from typing import Optional
+
+from src.conf.config import config as app_config
+
+# E.164: a country code and subscriber number of at most 15 digits in total.
+E164_MAX_DIGITS = 15
+E164_MIN_DIGITS = 8
+# Longer digit strings that already start with the default country code are
+# taken to include it ("380501234567" rather than a national number).
+NATIONAL_MAX_DIGITS = 10
+
+_EXTENSION = re.compile(r"(?:ext\.?|x|#).*$", re.IGNORECASE)
+_NON_DIGITS = re.compile(r"\D")
+
+
+def normalize_phone(
+    raw: Optional[str], default_country_code: Optional[str] = None
+) -> Optional[str]:
+    """Best-effort E.164 form of a free-form phone number, or None.
+
+    Numbers without an international prefix ("+" or "00") are taken to be
+    national numbers in `default_country_code` (PHONE_DEFAULT_COUNTRY_CODE),
+    with a leading trunk "0" dropped.
+    """
+    if not raw:
+        return None
+    default_country_code = default_country_code or app_config.PHONE_DEFAULT_COUNTRY_CODE
+
+    number = _EXTENSION.sub("", raw).strip()
+    digits = _NON_DIGITS.sub("", number)
+    if number.startswith("+"):
+        pass
+    elif digits.startswith("00"):
+        digits = digits[2:]
+    elif digits.startswith("0"):
+        digits = default_country_code + digits[1:]
+    elif not (
+        digits.startswith(default_country_code) and len(digits) > NATIONAL_MAX_DIGITS
+    ):
+        digits = default_country_code + digits
+
+    if not E164_MIN_DIGITS <= len(digits) <= E164_MAX_DIGITS or digits[0] == "0":
+        return None
+    return f"+{digits}"
@@ -0,0 +1,32 @@
+import asyncio
+import logging
+from datetime import datetime, time, timedelta
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+def seconds_until(at: time, now: datetime | None = None) -> float:
+    now = now or datetime.now()
+    next_run = datetime.combine(now.date(), at)
+    if next_run <= now:
+        next_run += timedelta(days=1)
+    return (next_run - now).total_seconds()
+
+
+async def run_daily(
+    name: str,
+    job: Callable[[], Awaitable[None]],
+    at: time = time(0, 0),
+    run_on_start: bool = True,
+):
+    if not run_on_start:
+        await asyncio.sleep(seconds_until(at))
+    while True:
+        try:
+            await job()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Scheduled job %s failed", name)
+        await asyncio.sleep(seconds_until(at))
@@ -1,9 +1,7 @@
-import cloudinary
-import cloudinary.uploader
-
-
 class UploadFileService:
     def __init__(self, cloud_name, api_key, api_secret):
+        import cloudinary
+
         self.cloud_name = cloud_name
         self.api_key = api_key
         self.api_secret = api_secret
@@ -16,6 +14,9 @@ class UploadFileService:
 
     @staticmethod
     def upload_file(file, username) -> str:
+        import cloudinary
+        import cloudinary.uploader
+
         public_id = f"MyRestApp/{username}"
         r = cloudinary.uploader.upload(file.file, public_id=public_id, overwrite=True)
         src_url = cloudinary.CloudinaryImage(public_id).build_url(
@@ -1,21 +1,28 @@
+import logging
+
 from sqlalchemy.ext.asyncio import AsyncSession
-from libgravatar import Gravatar
 
 from src.repository.users import UserRepository
 from src.schemas import UserCreate
+from src.tracing import traced
+
+logger = logging.getLogger(__name__)
 
 
+@traced("service")
 class UserService:
     def __init__(self, db: AsyncSession):
         self.repository = UserRepository(db)
 
     async def create_user(self, body: UserCreate):
+        from libgravatar import Gravatar
+
         avatar = None
         try:
             g = Gravatar(body.email)
             avatar = g.get_image()
         except Exception as e:
-            print(e)
+            logger.warning("Gravatar lookup failed for %s: %s", body.email, e)
 
         return await self.repository.create_user(body, avatar)
 
@@ -0,0 +1,118 @@
+import argparse
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+IMPORT_TIME_LINE = re.compile(
+    r"^import time:\s+(?P<self>\d+)\s+\|\s+(?P<cumulative>\d+)\s+\|(?P<indent>\s+)(?P<module>\S+)$"
+)
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+# What any worker pays before the app's own code: the budget is relative to
+# this, so it holds on slow and fast machines alike.
+BASELINE_IMPORTS = "fastapi, sqlalchemy.ext.asyncio, pydantic_settings, asyncpg"
+
+
+def run_import_profile(target: str) -> tuple[list[dict], float]:
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if completed.returncode != 0:
+        tail = "\n".join(completed.stderr.strip().splitlines()[-10:])
+        raise SystemExit(f"Importing {target!r} failed:\n{tail}")
+
+    rows = []
+    for line in completed.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match is None:
+            continue
+        rows.append(
+            {
+                "module": match["module"],
+                "self_ms": int(match["self"]) / 1000,
+                "cumulative_ms": int(match["cumulative"]) / 1000,
+                "depth": (len(match["indent"]) - 1) // 2,
+            }
+        )
+    return rows, wall_ms
+
+
+def total_import_ms(rows: list[dict]) -> float:
+    return sum(row["cumulative_ms"] for row in rows if row["depth"] == 0)
+
+
+def summarize(rows: list[dict], top: int) -> tuple[list, list]:
+    by_package = defaultdict(float)
+    for row in rows:
+        by_package[row["module"].split(".")[0]] += row["self_ms"]
+    packages = sorted(by_package.items(), key=lambda item: item[1], reverse=True)
+    modules = sorted(rows, key=lambda row: row["cumulative_ms"], reverse=True)
+    return packages[:top], modules[:top]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Report per-module import time of the application entry point."
+    )
+    parser.add_argument("--target", default="main", help="module to import")
+    parser.add_argument("--top", type=int, default=20, help="rows per table")
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="fresh interpreters per measurement; the fastest run counts",
+    )
+    parser.add_argument(
+        "--budget-ratio",
+        type=float,
+        default=None,
+        help="fail when importing the target takes longer than this multiple of "
+        "importing the framework alone (defaults to STARTUP_IMPORT_BUDGET_RATIO)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.budget_ratio is None:
+        from src.conf.config import config as app_config
+
+        args.budget_ratio = app_config.STARTUP_IMPORT_BUDGET_RATIO
+
+    # Interleaved, so both sides see the same machine load.
+    runs, baseline_ms = [], float("inf")
+    for _ in range(max(1, args.repeat)):
+        baseline_rows, _ = run_import_profile(BASELINE_IMPORTS)
+        baseline_ms = min(baseline_ms, total_import_ms(baseline_rows))
+        runs.append(run_import_profile(args.target))
+    rows, wall_ms = min(runs, key=lambda run: total_import_ms(run[0]))
+    import_ms = total_import_ms(rows)
+    packages, modules = summarize(rows, args.top)
+
+    print(f"{'package':<40} {'self ms':>10}")
+    for package, self_ms in packages:
+        print(f"{package:<40} {self_ms:>10.1f}")
+    print()
+    print(f"{'module':<60} {'self ms':>10} {'cumul. ms':>10}")
+    for row in modules:
+        print(
+            f"{row['module']:<60} {row['self_ms']:>10.1f} {row['cumulative_ms']:>10.1f}"
+        )
+    print()
+    ratio = import_ms / baseline_ms if baseline_ms else 0.0
+    print(f"import {args.target}: {import_ms:.1f} ms")
+    print(f"import {BASELINE_IMPORTS}: {baseline_ms:.1f} ms")
+    print(f"ratio: {ratio:.2f} (budget {args.budget_ratio:.2f})")
+    print(f"interpreter cold start incl. imports: {wall_ms:.1f} ms")
+
+    return 0 if ratio <= args.budget_ratio else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
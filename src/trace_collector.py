@@ -0,0 +1,95 @@
+import argparse
+import json
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Local stand-in for an OpenTelemetry collector: accepts OTLP/HTTP JSON on
+# POST /v1/traces (what TRACE_EXPORTER=otlp sends) and appends one line per
+# span to a file, so traces can be inspected without running a real backend.
+
+
+def _value(value: dict):
+    kind, raw = next(iter(value.items()))
+    # OTLP JSON encodes 64-bit integers as strings.
+    return int(raw) if kind == "intValue" else raw
+
+
+def _attributes(attributes: list) -> dict:
+    return {item["key"]: _value(item["value"]) for item in attributes}
+
+
+def flatten(payload: dict):
+    for resource_spans in payload.get("resourceSpans", []):
+        resource = _attributes(resource_spans.get("resource", {}).get("attributes", []))
+        for scope_spans in resource_spans.get("scopeSpans", []):
+            for span in scope_spans.get("spans", []):
+                start = int(span["startTimeUnixNano"])
+                end = int(span["endTimeUnixNano"])
+                yield {
+                    "service": resource.get("service.name"),
+                    "name": span["name"],
+                    "trace_id": span["traceId"],
+                    "span_id": span["spanId"],
+                    "parent_id": span.get("parentSpanId"),
+                    "start_ns": start,
+                    "duration_ms": round((end - start) / 1e6, 3),
+                    "attributes": _attributes(span.get("attributes", [])),
+                    "error": span.get("status", {}).get("message"),
+                }
+
+
+def make_handler(output_path: str):
+    class CollectorHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != "/v1/traces":
+                self.send_error(404)
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length))
+                spans = list(flatten(payload))
+            except (ValueError, KeyError, TypeError) as e:
+                self.send_error(400, str(e))
+                return
+
+            with open(output_path, "a", encoding="utf-8") as out:
+                for span in spans:
+                    out.write(json.dumps(span) + "\n")
+
+            body = b"{}"
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return CollectorHandler
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Receive OTLP/HTTP JSON spans and append them to a file."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4318)
+    parser.add_argument("--output", default="collected-traces.jsonl")
+    args = parser.parse_args(argv)
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.output))
+    print(
+        f"Collecting spans on http://{args.host}:{args.port}/v1/traces -> {args.output}"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,331 @@
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from src.conf.config import config as app_config
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None = None
+    start_ns: int = 0
+    end_ns: int = 0
+    attributes: dict = field(default_factory=dict)
+    error: str | None = None
+    sampled: bool = True
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+# Marks the rest of a trace whose root was not sampled: nested spans see it
+# and skip all work.
+_UNSAMPLED = Span(name="", trace_id="", span_id="", sampled=False)
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+def current_span() -> Span | None:
+    span = _current_span.get()
+    return span if span is not None and span.sampled else None
+
+
+def parse_traceparent(header: bytes | str | None) -> Span | None:
+    # W3C trace context: continue the caller's trace and honour its sampling
+    # decision.
+    if not header:
+        return None
+    if isinstance(header, bytes):
+        header = header.decode("latin-1")
+    match = _TRACEPARENT.match(header.strip().lower())
+    if match is None:
+        return None
+    trace_id, span_id, flags = match.groups()
+    return Span(
+        name="remote",
+        trace_id=trace_id,
+        span_id=span_id,
+        sampled=bool(int(flags, 16) & 1),
+    )
+
+
+class FileSpanExporter:
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, spans: list[Span], service_name: str):
+        with open(self.path, "a", encoding="utf-8") as out:
+            for span in spans:
+                out.write(json.dumps({"service": service_name, **span.to_dict()}))
+                out.write("\n")
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: dict) -> list:
+    return [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items()]
+
+
+class OTLPHttpExporter:
+    """OTLP/HTTP with the JSON encoding: POST {endpoint}/v1/traces."""
+
+    def __init__(self, endpoint: str, timeout: float = 5.0):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.timeout = timeout
+
+    def export(self, spans: list[Span], service_name: str):
+        payload = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": _otlp_attributes({"service.name": service_name})
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": __name__},
+                            "spans": [self._span(span) for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(payload).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+    @staticmethod
+    def _span(span: Span) -> dict:
+        otlp = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            # SPAN_KIND_SERVER for request roots, SPAN_KIND_INTERNAL below.
+            "kind": 2 if span.parent_id is None else 1,
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": _otlp_attributes(span.attributes),
+            "status": {"code": 2, "message": span.error} if span.error else {},
+        }
+        if span.parent_id:
+            otlp["parentSpanId"] = span.parent_id
+        return otlp
+
+
+class Tracer:
+    """Head-sampled spans, exported in batches from a background thread.
+
+    Finished spans go into a bounded queue (dropped when full), so a slow or
+    unreachable collector never holds up a request.
+    """
+
+    def __init__(
+        self,
+        exporter=None,
+        sample_rate: float = 0.0,
+        service_name: str = "contacts-api",
+        max_queue: int = 2048,
+        batch_size: int = 256,
+        flush_interval: float = 2.0,
+    ):
+        self.exporter = exporter
+        self.sample_rate = sample_rate if exporter is not None else 0.0
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.started = 0
+        self.exported = 0
+        self.dropped = 0
+        self.failed_exports = 0
+        self._queue: queue.Queue = queue.Queue(max_queue)
+        self._thread: threading.Thread | None = None
+        self._pid: int | None = None
+
+    @contextmanager
+    def span(self, name: str, attributes: dict | None = None, parent: Span = None):
+        current = _current_span.get()
+        if current is None:
+            if parent is not None:
+                sampled = parent.sampled and self.exporter is not None
+            else:
+                sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+            if not sampled:
+                token = _current_span.set(_UNSAMPLED)
+                try:
+                    yield None
+                finally:
+                    _current_span.reset(token)
+                return
+            trace_id = parent.trace_id if parent else os.urandom(16).hex()
+            parent_id = parent.span_id if parent else None
+        elif not current.sampled:
+            yield None
+            return
+        else:
+            trace_id, parent_id = current.trace_id, current.span_id
+
+        span = Span(
+            name=name,
+            trace_id=trace_id,
+            span_id=os.urandom(8).hex(),
+            parent_id=parent_id,
+            start_ns=time.time_ns(),
+            attributes=dict(attributes or {}),
+        )
+        self.started += 1
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            _current_span.reset(token)
+            self._enqueue(span)
+
+    def _enqueue(self, span: Span):
+        if self._pid != os.getpid():
+            # First span in this (possibly forked) process.
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name="span-exporter", daemon=True
+            )
+            self._thread.start()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(
+                        timeout=max(0.0, deadline - time.monotonic())
+                    )
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            if batch:
+                self._export(batch)
+            if stop:
+                return
+
+    def _export(self, batch: list[Span]):
+        try:
+            self.exporter.export(batch, self.service_name)
+            self.exported += len(batch)
+        except Exception as e:
+            self.failed_exports += 1
+            logger.warning("Dropped %d spans: export failed: %s", len(batch), e)
+
+    def shutdown(self, timeout: float = 5.0):
+        if self._thread is None or self._pid != os.getpid():
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+        self._thread = None
+        self._pid = None
+
+    def stats(self) -> dict:
+        return {
+            "exporter": type(self.exporter).__name__ if self.exporter else None,
+            "sample_rate": self.sample_rate,
+            "spans_started": self.started,
+            "spans_exported": self.exported,
+            "spans_dropped": self.dropped,
+            "failed_exports": self.failed_exports,
+            "queued": self._queue.qsize(),
+        }
+
+
+def traced(layer: str):
+    """Class decorator: a span around every public coroutine method."""
+
+    def decorate(cls):
+        for name, method in list(vars(cls).items()):
+            if name.startswith("_") or not (
+                inspect.isfunction(method) and inspect.iscoroutinefunction(method)
+            ):
+                continue
+            setattr(cls, name, _traced_method(f"{layer}.{cls.__name__}.{name}", method))
+        return cls
+
+    return decorate
+
+
+def _traced_method(span_name: str, method):
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        current = _current_span.get()
+        if current is _UNSAMPLED or (current is None and tracer.sample_rate <= 0):
+            return await method(*args, **kwargs)
+        with tracer.span(span_name):
+            return await method(*args, **kwargs)
+
+    return wrapper
+
+
+def create_exporter(name: str):
+    if name == "none":
+        return None
+    if name == "file":
+        return FileSpanExporter(app_config.TRACE_FILE)
+    if name == "otlp":
+        return OTLPHttpExporter(app_config.TRACE_OTLP_ENDPOINT)
+    raise ValueError(f"Unknown trace exporter: {name}")
+
+
+tracer = Tracer(
+    create_exporter(app_config.TRACE_EXPORTER),
+    sample_rate=app_config.TRACE_SAMPLE_RATE,
+    service_name=app_config.TRACE_SERVICE_NAME,
+)
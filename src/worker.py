@@ -0,0 +1,47 @@
+import os
+import resource
+import sys
+import time
+from dataclasses import dataclass, field
+
+from src.middleware import in_flight
+
+
+def current_rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        # Peak RSS: kilobytes on Linux, bytes on macOS.
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+@dataclass
+class WorkerState:
+    index: int = 0
+    workers: int = 1
+    loop: str = "auto"
+    http: str = "auto"
+    max_requests: int | None = None
+    max_memory_mb: int | None = None
+    started_at: float = field(default_factory=time.time)
+
+    def health(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "worker": self.index,
+            "workers": self.workers,
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "loop": self.loop,
+            "http": self.http,
+            "requests_total": in_flight.total,
+            "requests_in_flight": in_flight.active,
+            "max_requests": self.max_requests,
+            "rss_mb": round(current_rss_mb(), 1),
+            "max_memory_mb": self.max_memory_mb,
+        }
+
+
+worker_state = WorkerState()
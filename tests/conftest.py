@@ -0,0 +1,48 @@
+import os
+import uuid
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.conf.config import config as app_config
+from src.database.db import DatabaseSessionManager
+from src.database.models import User
+
+
+@pytest.fixture
+def anyio_backend():
+    # asyncpg only runs on asyncio.
+    return "asyncio"
+
+
+@pytest.fixture
+async def sessionmanager():
+    # One engine per test: pooled asyncpg connections are bound to the event
+    # loop that opened them, and each test gets a fresh loop.
+    manager = DatabaseSessionManager(
+        os.environ.get("TEST_DATABASE_URL", app_config.DATABASE_URL)
+    )
+    try:
+        async with manager.session() as session:
+            await session.execute(text("SELECT 1 FROM contacts LIMIT 0"))
+    except (OSError, SQLAlchemyError) as e:
+        await manager.close()
+        pytest.skip(f"No migrated database to test against: {e}")
+    yield manager
+    await manager.close()
+
+
+@pytest.fixture
+async def user_id(sessionmanager):
+    name = f"test-{uuid.uuid4().hex[:12]}"
+    async with sessionmanager.session() as session:
+        user = User(username=name, email=f"{name}@example.com", hashed_password="x")
+        session.add(user)
+        await session.commit()
+        user_id = user.id
+    yield user_id
+    # Contacts, archive rows and tombstones go with the user (ON DELETE CASCADE).
+    async with sessionmanager.session() as session:
+        await session.execute(text("DELETE FROM users WHERE id = :id"), {"id": user_id})
+        await session.commit()
@@ -0,0 +1,33 @@
+from datetime import date
+
+import pytest
+
+from src.repository.birthdays import next_birthday
+
+
+@pytest.mark.parametrize(
+    "birthday, today, expected",
+    [
+        (date(1990, 5, 10), date(2026, 3, 1), date(2026, 5, 10)),
+        (date(1990, 5, 10), date(2026, 5, 10), date(2026, 5, 10)),
+        (date(1990, 5, 10), date(2026, 5, 11), date(2027, 5, 10)),
+        (date(1990, 1, 1), date(2026, 12, 31), date(2027, 1, 1)),
+    ],
+)
+def test_next_birthday(birthday, today, expected):
+    assert next_birthday(birthday, today) == expected
+
+
+@pytest.mark.parametrize(
+    "today, expected",
+    [
+        # Celebrated on 28 February outside leap years.
+        (date(2026, 1, 15), date(2026, 2, 28)),
+        (date(2026, 2, 28), date(2026, 2, 28)),
+        (date(2026, 3, 1), date(2027, 2, 28)),
+        (date(2027, 3, 1), date(2028, 2, 29)),
+        (date(2028, 2, 29), date(2028, 2, 29)),
+    ],
+)
+def test_next_birthday_on_29_february(today, expected):
+    assert next_birthday(date(2000, 2, 29), today) == expected
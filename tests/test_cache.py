@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+
+from src.services.cache import ContactCache, InMemorySharedCache, LRUCache
+
+pytestmark = pytest.mark.anyio
+
+
+def make_cache(shared=None) -> ContactCache:
+    return ContactCache(LRUCache(max_entries=100, ttl=60), shared, ttl=60)
+
+
+class Loader:
+    def __init__(self):
+        self.value = "old"
+        self.calls = 0
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def __call__(self):
+        self.calls += 1
+        value = self.value
+        await self.gate.wait()
+        return value
+
+    async def started(self, calls: int):
+        while self.calls < calls:
+            await asyncio.sleep(0)
+
+
+@pytest.mark.parametrize("shared", [None, InMemorySharedCache()])
+async def test_read_after_write_sees_the_write(shared):
+    cache, loader = make_cache(shared), Loader()
+
+    assert await cache.get_or_load(1, ("contact", 7), loader) == "old"
+    assert await cache.get_or_load(1, ("contact", 7), loader) == "old"
+    assert loader.calls == 1
+
+    loader.value = "new"
+    await cache.invalidate_user(1)
+
+    assert await cache.get_or_load(1, ("contact", 7), loader) == "new"
+    assert loader.calls == 2
+
+
+async def test_invalidation_is_per_user():
+    cache, loader = make_cache(), Loader()
+    await cache.get_or_load(1, ("list",), loader)
+    await cache.get_or_load(2, ("list",), loader)
+
+    await cache.invalidate_user(1)
+    await cache.get_or_load(2, ("list",), loader)
+
+    assert loader.calls == 2
+
+
+async def test_concurrent_misses_share_one_load():
+    cache, loader = make_cache(), Loader()
+    loader.gate.clear()
+
+    reads = [
+        asyncio.create_task(cache.get_or_load(1, ("list",), loader)) for _ in range(5)
+    ]
+    await loader.started(1)
+    loader.gate.set()
+
+    assert await asyncio.gather(*reads) == ["old"] * 5
+    assert loader.calls == 1
+    assert cache.stats()["misses"] == 1
+
+
+async def test_read_after_write_does_not_join_an_older_load():
+    cache, loader = make_cache(), Loader()
+    loader.gate.clear()
+    before = asyncio.create_task(cache.get_or_load(1, ("list",), loader))
+    await loader.started(1)
+
+    loader.value = "new"
+    await cache.invalidate_user(1)
+    after = asyncio.create_task(cache.get_or_load(1, ("list",), loader))
+    await loader.started(2)
+    loader.gate.set()
+
+    assert await before == "old"
+    assert await after == "new"
+    assert await cache.get_or_load(1, ("list",), loader) == "new"
+
+
+async def test_disabled_cache_still_coalesces_loads():
+    cache, loader = make_cache(), Loader()
+    cache.enabled = False
+    loader.gate.clear()
+
+    reads = [
+        asyncio.create_task(cache.get_or_load(1, ("list",), loader)) for _ in range(3)
+    ]
+    await loader.started(1)
+    loader.gate.set()
+    await asyncio.gather(*reads)
+    await cache.get_or_load(1, ("list",), loader)
+
+    assert loader.calls == 2
+
+
+@pytest.mark.parametrize(
+    "workers, shared, events_backend, local_tier",
+    [
+        (1, None, "memory", True),
+        (4, None, "memory", False),
+        (4, InMemorySharedCache(), "memory", False),
+        (4, None, "postgres", True),
+    ],
+)
+async def test_local_tier_needs_cross_worker_invalidation(
+    workers, shared, events_backend, local_tier
+):
+    cache, loader = make_cache(shared), Loader()
+
+    assert cache.check_coherence(workers, events_backend) is local_tier
+    await cache.get_or_load(1, ("list",), loader)
+    await cache.get_or_load(1, ("list",), loader)
+
+    assert len(cache.local) == (1 if local_tier else 0)
+    assert loader.calls == (1 if local_tier else 2)
+
+
+async def test_events_resync_retires_local_entries():
+    cache, loader = make_cache(), Loader()
+    await cache.get_or_load(1, ("list",), loader)
+
+    cache.on_events_resync()
+    await cache.get_or_load(1, ("list",), loader)
+
+    assert loader.calls == 2
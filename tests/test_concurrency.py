@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from src.middleware import AIMDLimiter
+
+pytestmark = pytest.mark.anyio
+
+
+def make_limiter(**options) -> AIMDLimiter:
+    return AIMDLimiter(
+        "test",
+        **{
+            "latency_target": 0.1,
+            "initial_limit": 2,
+            "min_limit": 1,
+            "max_limit": 3,
+            "max_queue": 1,
+            "queue_timeout": 0.05,
+            **options,
+        },
+    )
+
+
+async def test_limit_grows_only_while_saturated():
+    limiter = make_limiter()
+    assert await limiter.acquire() and await limiter.acquire()
+
+    limiter.release(0.01, failed=False)
+    assert limiter.limit == pytest.approx(2.5)
+    # Below the limit a fast response says nothing about spare capacity.
+    limiter.release(0.01, failed=False)
+    assert limiter.limit == pytest.approx(2.5)
+
+
+async def test_limit_stops_at_max_limit():
+    limiter = make_limiter()
+    for _ in range(20):
+        while limiter.in_flight < int(limiter.limit):
+            await limiter.acquire()
+        while limiter.in_flight:
+            limiter.release(0.01, failed=False)
+    assert limiter.limit == 3
+
+
+@pytest.mark.parametrize("latency, failed", [(0.5, False), (0.01, True)])
+async def test_slow_or_failed_responses_cut_the_limit_once_per_window(latency, failed):
+    limiter = make_limiter(initial_limit=3)
+    for _ in range(3):
+        await limiter.acquire()
+
+    for _ in range(3):
+        limiter.release(latency, failed=failed)
+    assert limiter.limit == pytest.approx(2.7)
+    assert limiter.decreases == 1
+
+
+async def test_limit_never_drops_below_min_limit():
+    limiter = make_limiter(initial_limit=1, latency_target=0)
+    for _ in range(5):
+        await limiter.acquire()
+        await asyncio.sleep(0.001)
+        limiter.release(1.0, failed=True)
+    assert limiter.limit == 1
+
+
+async def test_full_queue_rejects_at_once():
+    limiter = make_limiter(initial_limit=1, queue_timeout=1)
+    assert await limiter.acquire()
+    queued = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+
+    assert await limiter.acquire() is False
+    assert limiter.stats()["waiting"] == 1
+
+    limiter.release(0.01, failed=False)
+    assert await queued is True
+    assert limiter.in_flight == 1
+    assert (limiter.rejected, limiter.queued) == (1, 1)
+
+
+async def test_queued_request_times_out():
+    limiter = make_limiter(initial_limit=1)
+    assert await limiter.acquire()
+
+    assert await limiter.acquire() is False
+    assert limiter.stats()["waiting"] == 0
+    assert limiter.rejected == 1
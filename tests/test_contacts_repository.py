@@ -0,0 +1,164 @@
+import asyncio
+import uuid
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import update
+
+from src.database.models import ContactTombstone, User
+from src.repository.contacts import ContactRepository
+from src.schemas import ContactCreate, ContactUpdate
+from src.services.contacts import ContactService
+
+pytestmark = pytest.mark.anyio
+
+
+def contact_data(first_name: str, **fields) -> dict:
+    return {
+        "first_name": first_name,
+        "last_name": "Tester",
+        "email": f"{first_name.lower()}-{uuid.uuid4().hex[:8]}@example.com",
+        "phone_number": "050 123 45 67",
+        **fields,
+    }
+
+
+async def create_contact(sessionmanager, user_id: int, first_name: str, **fields):
+    async with sessionmanager.session() as session:
+        user = await session.get(User, user_id)
+        return await ContactRepository(session).create_contact(
+            ContactCreate(**contact_data(first_name, **fields)), user
+        )
+
+
+async def get_changes(sessionmanager, user_id: int, since: int) -> dict:
+    async with sessionmanager.session() as session:
+        user = await session.get(User, user_id)
+        return await ContactRepository(session).get_changes(since, 100, user)
+
+
+async def test_sync_token_does_not_skip_a_slower_writer(sessionmanager, user_id):
+    contact = await create_contact(sessionmanager, user_id, "Alice")
+    token = (await get_changes(sessionmanager, user_id, 0))["token"]
+
+    # Writer A draws its sync_version, then stalls before committing.
+    a_written, a_release = asyncio.Event(), asyncio.Event()
+
+    async def writer_a():
+        async with sessionmanager.session() as session:
+            user = await session.get(User, user_id)
+            commit = session.commit
+
+            async def stalled_commit():
+                await session.flush()
+                a_written.set()
+                await a_release.wait()
+                await commit()
+
+            session.commit = stalled_commit
+            update = ContactUpdate(**contact_data("Alicia", email=contact.email))
+            await ContactRepository(session).update_contact(contact.id, update, user)
+
+    # Writer B starts after A's sync_version was drawn.
+    async def writer_b():
+        await a_written.wait()
+        await create_contact(sessionmanager, user_id, "Bob")
+
+    a, b = asyncio.create_task(writer_a()), asyncio.create_task(writer_b())
+    await a_written.wait()
+    await asyncio.sleep(0.2)
+    # A client syncing while A is still open must not be handed a token past
+    # A's change.
+    middle = await get_changes(sessionmanager, user_id, token)
+    a_release.set()
+    await asyncio.gather(a, b)
+
+    seen = {c.first_name for c in middle["upserted"]}
+    after = await get_changes(sessionmanager, user_id, middle["token"])
+    seen |= {c.first_name for c in after["upserted"]}
+    assert seen == {"Alicia", "Bob"}
+
+
+async def test_sync_tokens_follow_commit_order(sessionmanager, user_id):
+    token = (await get_changes(sessionmanager, user_id, 0))["token"]
+    names = [f"Contact{i}" for i in range(10)]
+
+    await asyncio.gather(
+        *(create_contact(sessionmanager, user_id, name) for name in names)
+    )
+
+    changes = await get_changes(sessionmanager, user_id, token)
+    assert sorted(c.first_name for c in changes["upserted"]) == sorted(names)
+    versions = [c.sync_version for c in changes["upserted"]]
+    assert versions == sorted(versions)
+    assert changes["token"] == versions[-1]
+
+
+async def test_archive_and_restore_round_trip(sessionmanager, user_id):
+    contact = await create_contact(
+        sessionmanager,
+        user_id,
+        "Carol",
+        tags=["family"],
+        additional_info="met at the conference",
+    )
+
+    async with sessionmanager.session() as session:
+        user = await session.get(User, user_id)
+        repo = ContactRepository(session)
+        archived = await repo.delete_contact(contact.id, user)
+        # Still readable after the commit.
+        assert (archived.id, archived.email) == (contact.id, contact.email)
+        assert await repo.get_contact_by_id(contact.id, user) is None
+        page = await repo.archive.get_archived(0, 10, user)
+        assert [c.id for c in page["contacts"]] == [contact.id]
+
+    deleted = await get_changes(sessionmanager, user_id, contact.sync_version)
+    assert contact.id in deleted["deleted"]
+
+    async with sessionmanager.session() as session:
+        user = await session.get(User, user_id)
+        repo = ContactRepository(session)
+        restored = await repo.restore_contact(contact.id, user)
+        assert restored.id == contact.id
+        assert restored.sync_version > contact.sync_version
+        assert (restored.email, restored.tags, restored.additional_info) == (
+            contact.email,
+            ["family"],
+            "met at the conference",
+        )
+        assert (await repo.archive.get_archived(0, 10, user))["total_count"] == 0
+        assert await repo.restore_contact(contact.id, user) is None
+
+    restored_changes = await get_changes(sessionmanager, user_id, deleted["token"])
+    assert [c.id for c in restored_changes["upserted"]] == [contact.id]
+
+
+async def test_purged_tombstones_expire_older_sync_tokens(sessionmanager, user_id):
+    kept = await create_contact(sessionmanager, user_id, "Dave")
+    gone = await create_contact(sessionmanager, user_id, "Erin")
+    token = kept.sync_version
+
+    async with sessionmanager.session() as session:
+        user = await session.get(User, user_id)
+        repo = ContactRepository(session)
+        await repo.delete_contact(gone.id, user)
+        await session.execute(
+            update(ContactTombstone)
+            .filter(ContactTombstone.contact_id == gone.id)
+            .values(deleted_at=ContactTombstone.deleted_at - timedelta(days=2))
+        )
+        await session.commit()
+
+        assert await repo.purge_tombstones(timedelta(days=1), batch_size=1) >= 1
+        horizon = await repo.get_sync_horizon(user)
+        assert horizon > token
+
+        service = ContactService(session)
+        with pytest.raises(HTTPException) as expired:
+            await service.get_changes(token, 100, user)
+        assert expired.value.status_code == 410
+        assert (await service.get_changes(horizon, 100, user))["deleted"] == []
+        full = await service.get_changes(0, 100, user)
+        assert [c.id for c in full["upserted"]] == [kept.id]
@@ -0,0 +1,53 @@
+import pytest
+
+from src.services.dedupe import email_key, name_key, soundex
+
+
+@pytest.mark.parametrize(
+    "word, code",
+    [
+        ("Robert", "R163"),
+        ("Rupert", "R163"),
+        ("Rubin", "R150"),
+        ("Ashcraft", "A261"),
+        ("Tymczak", "T522"),
+        ("Pfister", "P236"),
+        ("Honeyman", "H555"),
+        ("Lee", "L000"),
+        ("O'Hara", "O600"),
+        ("Іван", ""),
+        ("", ""),
+    ],
+)
+def test_soundex(word, code):
+    assert soundex(word) == code
+
+
+def test_name_key_ignores_order_and_spelling_variants():
+    assert name_key("Robert", "Smith") == name_key("Smyth", "Rupert")
+    assert name_key("Robert", "Smith") != name_key("Robert", "Jones")
+
+
+def test_name_key_without_latin_letters_uses_the_folded_name():
+    assert name_key("Іван", "Петренко") == name_key("ПЕТРЕНКО", "іван")
+    assert name_key("Іван", "Петренко") == "петренко іван"
+
+
+def test_name_key_of_an_empty_name():
+    assert name_key(None, "") is None
+    assert name_key("Lee", None) == "L000"
+
+
+@pytest.mark.parametrize(
+    "email, key",
+    [
+        ("J.Doe+work@example.com", "jdoe"),
+        ("jdoe@other.org", "jdoe"),
+        ("john.doe@example.com", "johndoe"),
+        ("+tag@example.com", None),
+        ("", None),
+        (None, None),
+    ],
+)
+def test_email_key(email, key):
+    assert email_key(email) == key
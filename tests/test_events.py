@@ -0,0 +1,60 @@
+import pytest
+
+from src.events import (
+    ContactEvent,
+    ContactEventBroker,
+    InMemoryBackend,
+    SubscriptionClosed,
+)
+
+
+@pytest.mark.parametrize(
+    "workers, configured, backend, coherent",
+    [
+        (1, None, "memory", True),
+        (1, "memory", "memory", True),
+        (4, None, "postgres", True),
+        (4, "memory", "memory", False),
+    ],
+)
+def test_several_workers_share_events_through_postgres(
+    workers, configured, backend, coherent
+):
+    broker = ContactEventBroker(InMemoryBackend(), max_queue=10)
+
+    assert broker.check_coherence(workers, configured) is coherent
+    assert broker.stats()["backend"] == backend
+
+
+@pytest.mark.anyio
+async def test_resync_ends_streams_and_tells_listeners():
+    broker = ContactEventBroker(InMemoryBackend(), max_queue=10)
+    resyncs = []
+    broker.add_listener(lambda event: None, on_resync=lambda: resyncs.append(1))
+    await broker.start()
+    subscription = broker.subscribe(user_id=1)
+
+    broker._resync()
+
+    assert subscription.missed_events and not subscription.overflowed
+    with pytest.raises(SubscriptionClosed):
+        await subscription.next_event(timeout=1)
+    assert resyncs == [1]
+    assert broker.subscriber_count == 0
+    assert broker.stats()["resyncs"] == 1
+    await broker.stop()
+
+
+@pytest.mark.anyio
+async def test_overflow_marks_missed_events():
+    broker = ContactEventBroker(InMemoryBackend(), max_queue=1)
+    await broker.start()
+    subscription = broker.subscribe(user_id=1)
+
+    for contact_id in (1, 2):
+        await broker.publish(
+            ContactEvent(user_id=1, action="updated", contact_id=contact_id)
+        )
+
+    assert subscription.overflowed and subscription.missed_events
+    await broker.stop()
@@ -0,0 +1,77 @@
+import json
+import logging
+import logging.config
+import queue
+
+from uvicorn.config import LOGGING_CONFIG
+
+from src.conf.logging_config import (
+    JsonFormatter,
+    NonBlockingQueueHandler,
+    logging_state,
+    request_id_var,
+    setup_logging,
+    shutdown_logging,
+)
+
+
+def make_record(msg="hello %s", args=("world",), **extra) -> logging.LogRecord:
+    record = logging.makeLogRecord(
+        {"name": "test", "levelname": "INFO", "msg": msg, "args": args}
+    )
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_renders_one_object_per_record():
+    entry = json.loads(
+        JsonFormatter().format(make_record(request_id="abc", user_id=7, skip=None))
+    )
+
+    assert entry["message"] == "hello world"
+    assert (entry["level"], entry["logger"]) == ("INFO", "test")
+    assert (entry["request_id"], entry["user_id"]) == ("abc", 7)
+    assert "skip" not in entry and "args" not in entry
+    assert entry["ts"].endswith("+00:00")
+
+
+def test_json_formatter_includes_the_traceback():
+    try:
+        raise ValueError("boom")
+    except ValueError as e:
+        record = make_record(exc_info=(type(e), e, e.__traceback__))
+
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert "ValueError: boom" in entry["exc_info"]
+
+
+def test_queue_handler_captures_context_and_drops_when_full():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    token = request_id_var.set("req-1")
+    try:
+        handler.handle(make_record())
+        handler.handle(make_record())
+    finally:
+        request_id_var.reset(token)
+
+    record = handler.queue.get_nowait()
+    assert (record.msg, record.args) == ("hello world", None)
+    assert record.request_id == "req-1"
+    assert handler.dropped == 1
+
+
+def test_server_loggers_go_through_the_queue():
+    logging.config.dictConfig(LOGGING_CONFIG)
+    root = logging.getLogger()
+    saved = (list(root.handlers), root.level)
+    setup_logging("INFO", "json", queue_size=10)
+    try:
+        access = logging.getLogger("uvicorn.access")
+        assert access.handlers == [] and access.propagate
+        assert logging.getLogger("uvicorn").propagate
+        assert root.handlers == [logging_state.handler]
+    finally:
+        shutdown_logging()
+        root.handlers[:] = saved[0]
+        root.setLevel(saved[1])
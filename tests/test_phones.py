@@ -0,0 +1,33 @@
+import pytest
+
+from src.services.phones import normalize_phone
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ("+380 50 123 45 67", "+380501234567"),
+        ("+38 (050) 123-45-67", "+380501234567"),
+        ("00380501234567", "+380501234567"),
+        ("050 123 45 67", "+380501234567"),
+        ("501234567", "+380501234567"),
+        ("380501234567", "+380501234567"),
+        ("+1 (212) 555-0100 ext. 12", "+12125550100"),
+        ("+44 20 7946 0958 #3", "+442079460958"),
+        ("0048 22 123 45 67", "+48221234567"),
+    ],
+)
+def test_normalize_phone(raw, expected):
+    assert normalize_phone(raw, "380") == expected
+
+
+@pytest.mark.parametrize(
+    "raw", [None, "", "n/a", "12", "+0501234567", "+1234567890123456"]
+)
+def test_normalize_phone_rejects_what_is_not_a_number(raw):
+    assert normalize_phone(raw, "380") is None
+
+
+def test_normalize_phone_uses_the_given_country_code():
+    assert normalize_phone("030 1234567", "49") == "+49301234567"
+    assert normalize_phone("030 1234567", "380") == "+380301234567"
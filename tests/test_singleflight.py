@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from src.services.singleflight import SingleFlight
+
+pytestmark = pytest.mark.anyio
+
+
+class Execution:
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.started = 0
+        self.finished = 0
+        self.cancelled = 0
+
+    async def __call__(self):
+        self.started += 1
+        try:
+            await self.gate.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        self.finished += 1
+        return "result"
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_cancelled_leader_waits_for_its_followers():
+    flight, execution = SingleFlight(), Execution()
+    leader = asyncio.create_task(flight.do("key", execution))
+    await settle()
+    follower = asyncio.create_task(flight.do("key", execution))
+    await settle()
+
+    leader.cancel()
+    await settle()
+    # The execution runs on the leader's resources, so the leader stays.
+    assert not leader.done()
+
+    execution.gate.set()
+    assert await follower == "result"
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert (execution.started, execution.finished) == (1, 1)
+    assert flight.stats()["collapsed"] == 1
+
+
+async def test_cancelled_leader_alone_cancels_the_execution():
+    flight, execution = SingleFlight(), Execution()
+    leader = asyncio.create_task(flight.do("key", execution))
+    await settle()
+
+    leader.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert execution.cancelled == 1
+    assert flight.stats()["in_flight"] == 0
+
+    execution.gate.set()
+    assert await flight.do("key", execution) == "result"
+    assert execution.started == 2
+
+
+async def test_cancelled_follower_leaves_the_execution_running():
+    flight, execution = SingleFlight(), Execution()
+    leader = asyncio.create_task(flight.do("key", execution))
+    await settle()
+    follower = asyncio.create_task(flight.do("key", execution))
+    await settle()
+
+    follower.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await follower
+    execution.gate.set()
+
+    assert await leader == "result"
+    assert execution.cancelled == 0
+
+
+async def test_errors_reach_every_caller_and_are_not_cached():
+    flight, calls = SingleFlight(), 0
+
+    async def failing():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        flight.do("key", failing), flight.do("key", failing), return_exceptions=True
+    )
+    assert [type(result) for result in results] == [ValueError, ValueError]
+    with pytest.raises(ValueError):
+        await flight.do("key", failing)
+    assert calls == 2
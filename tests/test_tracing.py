@@ -0,0 +1,35 @@
+import pytest
+
+from src.tracing import parse_traceparent
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+SPAN_ID = "00f067aa0ba902b7"
+
+
+@pytest.mark.parametrize("flags, sampled", [("01", True), ("00", False), ("03", True)])
+def test_parse_traceparent(flags, sampled):
+    span = parse_traceparent(f"00-{TRACE_ID}-{SPAN_ID}-{flags}".encode())
+
+    assert (span.trace_id, span.span_id, span.sampled) == (TRACE_ID, SPAN_ID, sampled)
+
+
+def test_parse_traceparent_is_case_and_whitespace_insensitive():
+    span = parse_traceparent(f" 00-{TRACE_ID.upper()}-{SPAN_ID}-01 ")
+
+    assert span.trace_id == TRACE_ID
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        None,
+        b"",
+        f"01-{TRACE_ID}-{SPAN_ID}-01",
+        f"00-{TRACE_ID[:-1]}-{SPAN_ID}-01",
+        f"00-{TRACE_ID}-{SPAN_ID}",
+        f"00-{TRACE_ID}-{SPAN_ID}-01-extra",
+        "garbage",
+    ],
+)
+def test_parse_traceparent_ignores_malformed_headers(header):
+    assert parse_traceparent(header) is None